@@ -1,5 +1,5 @@
 import asyncio
-from datetime import datetime
+from typing import AsyncIterator
 import os
 from pydantic_ai import Agent, ModelSettings, UsageLimits
 from pydantic_ai.exceptions import ModelHTTPError
@@ -7,12 +7,20 @@ from pydantic_ai.mcp import MCPServerStdio
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from lib import read_yaml, verify_url_exists
+from utils.browser_pool import browser_pool
+from utils.cache import cache_key
+from utils.extract import ExtractedArticle, extract_article
+from utils.feeds import discover_latest_articles
+from utils.http import canonical_url
+from utils.rate_limit import limiters
+from utils.singleflight import SingleFlight
+from utils.source_index import source_index
+from utils.summary_store import summary_store
 from fastapi.responses import JSONResponse
 import time
-from browser_use import Tools, Browser, ChatGoogle, ChatAnthropic, ChatBrowserUse
+from browser_use import Tools, ChatGoogle, ChatAnthropic, ChatBrowserUse
 from browser_use import Agent as BrowserUseAgent
 from pathlib import Path
-import json
 
 load_dotenv(override=True)
 
@@ -33,6 +41,13 @@ OPENAI_MODEL_NAME = "gpt-5-nano"
 
 LATEST_ARTICLE_MODEL = GOOGLE_MODEL_NAME
 SUMMARIZE_ARTICLE_LLM = ChatAnthropic(model=ANTHROPIC_MODEL_NAME)
+SUMMARIZE_TEXT_MODEL = f"anthropic:{ANTHROPIC_MODEL_NAME}"  # For articles fetched without a browser
+
+# Batched summarization packs several extracted articles into one request
+SUMMARY_BATCH_TOKEN_BUDGET = int(os.getenv("SUMMARY_BATCH_TOKEN_BUDGET", 30_000))
+MAX_ARTICLES_PER_BATCH = 8
+CHARS_PER_TOKEN = 4  # Rough estimate, good enough to size batches
+SUMMARY_TOKENS_PER_ARTICLE = 300  # Room for instructions and the summary itself
 
 
 class UrlExtractResult(BaseModel, use_attribute_docstrings=True):
@@ -49,6 +64,31 @@ class SummarizationResult(BaseModel, use_attribute_docstrings=True):
     """Whether summarization was successful"""
 
 
+class ArticleSummary(BaseModel, use_attribute_docstrings=True):
+    index: int
+    """Index of the article, as numbered in the prompt"""
+    summary: str
+    """Summary"""
+    successful: bool
+    """Whether summarization was successful"""
+
+
+class BatchSummarizationResult(BaseModel, use_attribute_docstrings=True):
+    summaries: list[ArticleSummary]
+    """One summary per article"""
+
+
+batch_summarizer_agent = Agent(
+    SUMMARIZE_TEXT_MODEL,
+    output_type=BatchSummarizationResult,
+    model_settings=ModelSettings(temperature=0.1),
+)
+
+
+# "No articles found" is returned as None or {}, let the next request try again
+latest_flight = SingleFlight("latest", succeeded=bool)
+summary_flight = SingleFlight("summaries")
+
 browser_use_server = MCPServerStdio("uvx", args=["browser-use[cli]", "--mcp"], timeout=10)
 # browser_use_server = MCPServerStdio(
 #     "uvx",
@@ -67,19 +107,15 @@ browser_use_server = MCPServerStdio("uvx", args=["browser-use[cli]", "--mcp"], t
 
 
 async def get_latest_articles(website: str, num_articles) -> list[str] | None:
-    browser = Browser(
-        headless=False,  # Show browser window
-    )
-
-    agent = BrowserUseAgent(
-        task=prompts["search_agent_prompt"].format(num_articles=num_articles) + f"\nWebsite: {website}",
-        browser=browser,
-        llm=ChatBrowserUse(),
-        use_vision=True,
-        output_model_schema=UrlExtractResult,
-    )
-
-    result = await agent.run()
+    async with limiters["browser_use"].limit(), browser_pool.borrow() as browser:
+        agent = BrowserUseAgent(
+            task=prompts["search_agent_prompt"].format(num_articles=num_articles) + f"\nWebsite: {website}",
+            browser=browser,
+            llm=ChatBrowserUse(),
+            use_vision=True,
+            output_model_schema=UrlExtractResult,
+        )
+        result = await agent.run()
 
     if result.is_done():
         urls = result.structured_output
@@ -152,62 +188,223 @@ async def get_latest_articles(website: str, num_articles) -> list[str] | None:
 #     return dict(zip(urls, summaries))
 
 
-async def concurrent_summarize(urls: list[str], max_summary_length: int) -> dict[str, str]:
-    num_urls = len(urls)
-    # Create n separate browser instances
-    browsers = [
-        Browser(
-            user_data_dir=f"./temp-profile-{i}",
-            headless=False,
-        )
-        for i in range(num_urls)
-    ]
-
-    # Create n agents with different tasks
-    agents = [
-        BrowserUseAgent(
-            task=prompts["summarizer_agent_prompt"].format(max_summary_length=max_summary_length, article=urls[i]),
-            browser=browsers[i],
-            # llm=ChatGoogle(model=GOOGLE_MODEL_NAME),
-            llm=SUMMARIZE_ARTICLE_LLM,
-            output_model_schema=SummarizationResult,
-            # use_vision=True,
+def batch_articles(articles: list[ExtractedArticle], token_budget: int) -> list[list[ExtractedArticle]]:
+    """Greedily pack articles into batches whose estimated prompt size fits the token budget"""
+    batches = []
+    batch, batch_tokens = [], 0
+    for article in articles:
+        tokens = (len(article.title) + len(article.text)) // CHARS_PER_TOKEN + SUMMARY_TOKENS_PER_ARTICLE
+        if batch and (batch_tokens + tokens > token_budget or len(batch) == MAX_ARTICLES_PER_BATCH):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        # An article over the budget on its own still gets a batch to itself
+        batch.append(article)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def summarize_batch(
+    articles: list[ExtractedArticle], max_summary_length: int
+) -> dict[str, SummarizationResult]:
+    """
+    Summarize several extracted articles with a single structured-output request.
+
+    Returns:
+        Summary per article URL, articles the model skipped are missing
+    """
+    articles_text = "\n\n".join(
+        f"[{index}] {article.title}\n{article.url}\n{article.text}"
+        for index, article in enumerate(articles)
+    )
+    async with limiters["anthropic"].limit():
+        result = await batch_summarizer_agent.run(
+            prompts["batch_summarizer_prompt"].format(
+                max_summary_length=max_summary_length, articles=articles_text
+            )
         )
-        for i in range(num_urls)
-    ]
 
-    # Run all agents in parallel
-    tasks = [agent.run() for agent in agents]
+    summaries = {}
+    for summary in result.output.summaries:
+        if 0 <= summary.index < len(articles):
+            summaries[articles[summary.index].url] = SummarizationResult(
+                summary=summary.summary, successful=summary.successful
+            )
+    return summaries
+
+
+async def summarize_with_agent(url: str, max_summary_length: int) -> SummarizationResult:
+    """Have a browser-use agent read the page itself, for JS-heavy or blocked pages"""
     try:
-        results = await asyncio.gather(*tasks, return_exceptions=False)
+        async with limiters["browser_use"].limit(), browser_pool.borrow() as browser:
+            agent = BrowserUseAgent(
+                task=prompts["summarizer_agent_prompt"].format(
+                    max_summary_length=max_summary_length, article=url
+                ),
+                browser=browser,
+                # llm=ChatGoogle(model=GOOGLE_MODEL_NAME),
+                llm=SUMMARIZE_ARTICLE_LLM,
+                output_model_schema=SummarizationResult,
+                # use_vision=True,
+            )
+            history = await agent.run()
+        # If summarization was completed, return the agent's structured output
+        if history.is_done() and history.final_result():
+            return SummarizationResult.model_validate_json(history.final_result())
     except Exception as e:
-        raise e
-
+        print(f"✗ Summarizing {url} failed: {type(e).__name__}: {str(e)}")
+
+    return SummarizationResult(summary="", successful=False)
+
+
+async def summarize_as_completed(
+    urls: list[str],
+    max_summary_length: int,
+    fetched: dict[str, ExtractedArticle | None] | None = None,
+) -> AsyncIterator[tuple[str, SummarizationResult]]:
+    """
+    Summarize every URL in parallel and yield (url, result) pairs as each one finishes.
+
+    Pages are fetched over plain HTTP first and the extracted articles are
+    summarized a batch at a time. A page only escalates to its own browser
+    agent when too little text can be extracted or the model gives up on it.
+    Pages in fetched were already downloaded by the caller and aren't
+    fetched again, None meaning they need a browser.
+
+    URLs already being summarized by another request join that request
+    instead of starting over.
+
+    A failing URL is yielded as an unsuccessful result instead of cancelling
+    the others. Closing the generator early cancels the work still running.
+    """
+    results: asyncio.Queue[tuple[str, SummarizationResult]] = asyncio.Queue()
+    tasks: list[asyncio.Task] = []
+
+    def spawn(coro):
+        tasks.append(asyncio.create_task(coro))
+
+    keys = {url: cache_key(canonical_url(url), max_summary_length) for url in urls}
+    owned: dict[str, asyncio.Future] = {}
+
+    def publish(url: str, summary: SummarizationResult):
+        results.put_nowait((url, summary))
+        # Failures aren't memoized, so the next request tries again
+        summary_flight.resolve(keys[url], summary, memoize=summary.successful)
+
+    async def _join(url: str, future: asyncio.Future):
+        results.put_nowait((url, await asyncio.shield(future)))
+
+    async def _run_agent(url: str):
+        publish(url, await summarize_with_agent(url, max_summary_length))
+
+    async def _run_batch(batch: list[ExtractedArticle]):
+        try:
+            summaries = await summarize_batch(batch, max_summary_length)
+        except Exception as e:
+            print(f"✗ Summarizing a batch of {len(batch)} failed: {type(e).__name__}: {str(e)}")
+            summaries = {}
+
+        for article in batch:
+            summary = summaries.get(article.url)
+            if summary and summary.successful:
+                publish(article.url, summary)
+            else:
+                spawn(_run_agent(article.url))
+
+    async def _extract(url: str) -> ExtractedArticle | None:
+        if fetched and url in fetched:
+            return fetched[url]
+        return await extract_article(url)
+
+    async def _extract_all():
+        # Batching needs every extraction back, which is bounded by the HTTP timeout
+        articles = await asyncio.gather(*[_extract(url) for url in owned], return_exceptions=True)
+        extracted = []
+        for url, article in zip(owned, articles):
+            if isinstance(article, ExtractedArticle):
+                extracted.append(article)
+            else:
+                # JS-heavy or blocked page, escalate to a browser agent
+                spawn(_run_agent(url))
+
+        for batch in batch_articles(extracted, SUMMARY_BATCH_TOKEN_BUDGET):
+            spawn(_run_batch(batch))
+
+    for url in urls:
+        future, leader = summary_flight.claim(keys[url])
+        if leader:
+            owned[url] = future
+        else:
+            spawn(_join(url, future))
+
+    spawn(_extract_all())
+    try:
+        for _ in urls:
+            yield await results.get()
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Release the requests that joined ours if we stopped before summarizing them
+        for url, future in owned.items():
+            if not future.done():
+                summary_flight.resolve(keys[url], SummarizationResult(summary="", successful=False), memoize=False)
+
+
+async def concurrent_summarize(
+    urls: list[str],
+    max_summary_length: int,
+    fetched: dict[str, ExtractedArticle | None] | None = None,
+) -> dict[str, str]:
     summaries = {}
-    for i, history in enumerate(results):
-        # If summarization was completed, add to the summaries dict
-        if history.is_done():
-            summary: SummarizationResult = SummarizationResult.model_validate_json(history.final_result())
-            # Check if summarization was successful
-            if summary.successful:
-                summaries[urls[i]] = summary.summary
+    async for url, summary in summarize_as_completed(urls, max_summary_length, fetched):
+        # Check if summarization was successful
+        if summary.successful:
+            summaries[url] = summary.summary
 
-    return summaries
+    # Keep the summaries in the order the URLs were given
+    return {url: summaries[url] for url in urls if url in summaries}
 
 
 async def get_latest_articles_and_summarize(
     website: str, num_articles: int, max_summary_length: int
+) -> dict[str, str] | None:
+    """Concurrent requests for the same source share one discovery and summarization run"""
+    key = cache_key(canonical_url(website), num_articles, max_summary_length)
+    return await latest_flight.do(
+        key, lambda: _get_latest_articles_and_summarize(website, num_articles, max_summary_length)
+    )
+
+
+async def _get_latest_articles_and_summarize(
+    website: str, num_articles: int, max_summary_length: int
 ) -> dict[str, str] | None:
     get_articles_start = time.perf_counter()
-    latest_urls = await get_latest_articles(website, num_articles)
+    # Most sources publish a feed or sitemap, the agent is only needed for the rest
+    latest_urls = await discover_latest_articles(website, num_articles)
+    if not latest_urls:
+        latest_urls = await get_latest_articles(website, num_articles)
     print(latest_urls)
     print(f"Retrieved latest articles in {time.perf_counter() - get_articles_start}")
 
     if latest_urls:
-        print(f"Summarizing the following articles: {latest_urls}")
+        # Only summarize what is new or changed since the last poll of this source
+        states = await source_index.check(website, latest_urls)
+        new_states = [state for state in states if state.summary is None]
+        new_urls = [state.url for state in new_states]
+        # Checking already downloaded most of them, don't fetch those again
+        fetched = {state.url: state.article for state in new_states if state.fetched}
+        print(f"Summarizing the following articles: {new_urls}")
         get_summaries_start = time.perf_counter()
-        result = await concurrent_summarize(latest_urls, max_summary_length)
-        print(f"Successfully retrieved {len(result)} summaries in {time.perf_counter() - get_summaries_start}")
+        summaries = await concurrent_summarize(new_urls, max_summary_length, fetched) if new_urls else {}
+        print(f"Successfully retrieved {len(summaries)} summaries in {time.perf_counter() - get_summaries_start}")
+        source_index.record(website, states, summaries)
+
+        result = {}
+        for state in states:
+            summary = summaries.get(state.url) or state.summary
+            if summary:
+                result[state.url] = summary
         return result
 
     return None
@@ -225,13 +422,7 @@ if __name__ == "__main__":
     website = "https://www.csdn.net/"
     summaries = asyncio.run(get_latest_articles_and_summarize(website, NUM_ARTICLES, MAX_SUMMARY_LENGTH))
     print(summaries)
-
-    now = datetime.now()
-
-    # Format it as a string
-    formatted_now = now.strftime("%Y-%m-%d_%H:%M:%S")
-
     print(f"Total time: {time.perf_counter() - start}")
 
-    with open(f"summaries/{website.replace("/", "-")}_{formatted_now}.json", "w") as f:
-        json.dump(summaries, f)
+    if summaries:
+        summary_store.add_summaries(website, summaries)
@@ -1,7 +1,9 @@
 import time
 from groq import AsyncGroq, Groq
 from dotenv import load_dotenv
-from lib import read_yaml, verify_url_exists
+from lib import read_yaml
+from utils.feeds import discover_latest_articles
+from utils.url_verifier import url_verifier
 from pydantic_ai import Agent
 import asyncio
 from pathlib import Path
@@ -49,11 +51,16 @@ async def format_and_verify_urls(result):
         formatted_urls_resp = await formatter_agent.run(f"The URLs are: {result}")
 
     formatted_urls = formatted_urls_resp.output
-    formatted_urls = list(filter(verify_url_exists, formatted_urls))
+    formatted_urls = await url_verifier.filter(formatted_urls)
     return formatted_urls
 
 
 async def get_latest_articles_groq(num_articles, website) -> list[str] | None:
+    # Feeds and sitemaps answer in milliseconds, only ask the LLMs when there are none
+    urls = await discover_latest_articles(website, num_articles)
+    if urls:
+        return urls
+
     result = await get_latest_articles(num_articles=num_articles, website=website)
 
     if result:
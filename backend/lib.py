@@ -1,5 +1,8 @@
+import asyncio
 import ruamel.yaml
-import requests
+
+from utils.http import new_http_client
+from utils.url_verifier import check_url, url_verifier
 
 
 def read_yaml(path: str):
@@ -11,16 +14,20 @@ def read_yaml(path: str):
 
 
 def verify_url_exists(url: str) -> bool:
-    try:
-        response = requests.head(url, allow_redirects=True, timeout=5)
-
-        if response.status_code >= 400:
-            response = requests.get(url, allow_redirects=True, timeout=5)
-
-        if 200 <= response.status_code < 400:
-            return True
-        else:
-            return False
-
-    except requests.exceptions.RequestException as e:
-        return False
+    """
+    Blocking wrapper around utils.url_verifier, for sync callers outside the event loop.
+
+    Coroutines should await url_verifier.verify() or url_verifier.filter() instead.
+    """
+    exists = url_verifier.cached(url)
+    if exists is not None:
+        return exists
+
+    async def _check() -> bool:
+        # The shared client belongs to the server's event loop, use a private one
+        async with new_http_client() as client:
+            return await check_url(client, url)
+
+    exists = asyncio.run(_check())
+    url_verifier.remember(url, exists)
+    return exists
@@ -1,75 +1,242 @@
-from datetime import datetime
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 import json
 from pathlib import Path
-from fastapi import FastAPI, Query
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from browseruse_get_latest_articles import (
     get_latest_articles_and_summarize,
-    concurrent_summarize,
+    latest_flight,
+    summarize_as_completed,
+    summary_flight,
 )
 
-from utils.elevenlabs import text_to_speech
+from utils.browser_pool import browser_pool
+from utils.cache import cache_key
+from utils.checkpoints import ArticleCheckpoint, CheckpointStore
+from utils.elevenlabs import text_to_speech_file, tts_cache
+from utils.http import close_http_client
+from utils.jobs import Job, JobManager, JobQueueFull, JobStatus
+from utils.pipeline import run_stage_graph
+from utils.prefetch import PREFETCH_ENABLED, PrefetchScheduler
+from utils.rate_limit import limiters
 from utils.scene_converter import (
     Scene,
     convert_to_scenes,
-    create_sora_video,
-    download_sora_video,
+    get_or_render_sora_clip,
     scene_to_sora_prompt,
+    sora_clip_cache,
+    sora_clip_flight,
+    sora_prompt_cache,
 )
+from utils.singleflight import SingleFlight
+from utils.source_index import source_index
+from utils.summary_store import summary_store
 from utils.video_processing import (
     combine_video_audio,
     combine_video_audio_with_padding,
     concatenate_videos,
+    render_reel,
+    segment_hls,
 )
+from utils.workspace import workspace
 import uvicorn
 import asyncio
+import os
+import re
+import shutil
 from ruamel.yaml import YAML
 
 
-app = FastAPI()
+# Caps scenes in flight; each provider call is throttled by its own limiter in utils/rate_limit.
+# Every scene needs a Sora slot, so admitting more scenes than the Sora limiter allows would
+# only leave them waiting in its queue while their timeout runs.
+MAX_CONCURRENT_SCENES = limiters["sora"].max_concurrency
+SCENE_TIMEOUT_SECONDS = 180
+scene_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCENES)
 
-MAX_CONCURRENT_REQUESTS = 10
-semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+MAX_CONCURRENT_SCENE_CONVERSIONS = 5  # No. of articles converted to scenes at the same time
+scene_conversion_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCENE_CONVERSIONS)
+
+# "per_scene" muxes every scene then concatenates, "single_pass" encodes the reel once
+REEL_RENDER_MODE = os.getenv("REEL_RENDER_MODE", "per_scene")
+
+# Segment every reel for HLS as soon as it is rendered instead of on the first HLS request
+HLS_ON_RENDER = os.getenv("REEL_HLS_ON_RENDER", "0") == "1"
+HLS_SEGMENT_SECONDS = 2
 
 NUM_RECENT_ARTICLES = 3  # No. of recent articles to return per website
 MAX_SUMMARY_LENGTH = 4  # Max no. of sentences for the summary
 
+MAX_CONCURRENT_JOBS = 2  # No. of background jobs running at the same time
+MAX_QUEUED_JOBS = 100  # No. of background jobs waiting before submissions are rejected
+SSE_HEARTBEAT_SECONDS = 15  # Idle time before a keepalive comment is sent on event streams
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # Stop proxies buffering events
 
-async def process_scene(scene: Scene, scene_index: int):
-    async with semaphore:
-        try:
-            print(f"Processing scene {scene_index}...")
+job_manager = JobManager(max_workers=MAX_CONCURRENT_JOBS, max_queued=MAX_QUEUED_JOBS)
+checkpoint_store = CheckpointStore()
 
-            # Add timeout for entire scene processing (3 minutes max)
-            async with asyncio.timeout(180):
-                sora_prompt = await scene_to_sora_prompt(scene)
 
-                # Convert Sora Video
-                sora_video = await create_sora_video(sora_prompt)
-                if sora_video is None:
-                    raise Exception("Sora video creation failed")
-                sora_video_path = await download_sora_video(sora_video)
+def reel_succeeded(result: dict | None) -> bool:
+    """Only complete reels are reused, so a retry re-renders failed articles and scenes"""
+    if result is None or "error" in result:
+        return False
+    return not any("error" in scene for scene in result["scenes"])
 
-                # Convert Audio with 11Labs
-                audio_bytes = await text_to_speech(scene.voice_over)
 
-                # Combine video and audio
-                final_video_path = await combine_video_audio_with_padding(
-                    sora_video_path, audio_bytes
-                )
+article_flight = SingleFlight("article_videos", succeeded=reel_succeeded)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_manager.start()
+    await browser_pool.start()
+    if PREFETCH_ENABLED:
+        prefetch_scheduler.start()
+    yield
+    await prefetch_scheduler.stop()
+    await job_manager.stop()
+    await browser_pool.stop()
+    await close_http_client()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+async def process_scene(
+    scene: Scene,
+    scene_index: int,
+    job: Job | None = None,
+    article_url: str | None = None,
+    checkpoint: ArticleCheckpoint | None = None,
+    mux: bool = True,
+):
+    """
+    Render one scene: Sora prompt and clip on one branch, voice-over on the other.
+
+    With mux=False the clip and audio are left separate for render_reel to
+    combine the whole article in a single ffmpeg pass.
+    """
+
+    def stored(field: str) -> str | None:
+        return checkpoint.scene_output(scene_index, field) if checkpoint else None
+
+    def record(field: str, value: str | None):
+        if checkpoint:
+            checkpoint_store.set_scene_output(checkpoint, scene_index, field, value)
+
+    def rendered(result: dict) -> dict:
+        # Muxed scenes are playable on their own, so streaming jobs can play them before the
+        # reel is done. They stay in the article's scratch scope and are collected with it.
+        if mux and job and article_url:
+            workspace.keep(result["final_video_path"], scene_file_name(scene_index))
+            result["scene_url"] = f"/reels/{article_key(article_url)}/scenes/{scene_index}"
+        if job and article_url:
+            job.update_scene(article_url, scene_index, "done")
+            job.emit(
+                "scene_rendered",
+                article_url=article_url,
+                scene_index=scene_index,
+                scene_url=result.get("scene_url"),
+            )
+        return result
+
+    def failed(error_msg: str):
+        if job and article_url:
+            job.update_scene(article_url, scene_index, "failed", error_msg)
+            job.emit(
+                "scene_failed",
+                article_url=article_url,
+                scene_index=scene_index,
+                error=error_msg,
+            )
+
+    if checkpoint and checkpoint.scene_done(scene_index, mux):
+        print(f"✓ Scene {scene_index} restored from checkpoint")
+        result = {
+            "scene_index": scene_index,
+            "scene": scene.model_dump(),
+            "sora_prompt": stored("sora_prompt"),
+            "sora_video": None,
+            "sora_video_cached": True,
+            "clip_path": stored("clip_path"),
+            "audio_path": stored("audio_path"),
+        }
+        if mux:
+            result["final_video_path"] = stored("final_video_path")
+        return rendered(result)
+
+    async def prompt_stage():
+        sora_prompt = stored("sora_prompt") or await scene_to_sora_prompt(scene)
+        record("sora_prompt", sora_prompt)
+        return sora_prompt
+
+    async def clip_stage(sora_prompt: str):
+        clip_path = stored("clip_path")
+        if clip_path:
+            return clip_path, None
+        clip_path, sora_video = await get_or_render_sora_clip(sora_prompt)
+        record("clip_path", clip_path)
+        return clip_path, sora_video
+
+    async def audio_stage():
+        audio_path = stored("audio_path")
+        if audio_path:
+            return audio_path, None
+        # Streamed straight to a file, its duration comes from the stream size
+        audio_path, audio_duration = await text_to_speech_file(scene.voice_over)
+        record("audio_path", audio_path)
+        return audio_path, audio_duration
+
+    async def mux_stage(sora_clip: tuple, audio: tuple):
+        audio_path, audio_duration = audio
+        final_video_path = await combine_video_audio_with_padding(
+            sora_clip[0], audio_path, audio_duration
+        )
+        record("final_video_path", final_video_path)
+        return final_video_path
+
+    stages = {
+        "sora_prompt": ([], prompt_stage),
+        "sora_clip": (["sora_prompt"], clip_stage),
+        "audio": ([], audio_stage),
+    }
+    if mux:
+        stages["final_video_path"] = (["sora_clip", "audio"], mux_stage)
+
+    async with scene_semaphore:
+        try:
+            print(f"Processing scene {scene_index}...")
+            if job and article_url:
+                job.update_scene(article_url, scene_index, "running")
+
+            async with asyncio.timeout(SCENE_TIMEOUT_SECONDS):
+                # The voice-over only depends on the scene, so TTS runs
+                # alongside the Sora branch and only the mux waits on both.
+                # Stages already checkpointed or cached for this scene are reused.
+                outputs = await run_stage_graph(stages)
+                clip_path, sora_video = outputs["sora_clip"]
 
                 print(f"✓ Scene {scene_index} processed successfully")
-                return {
+                record("error", None)
+                result = {
                     "scene_index": scene_index,
                     "scene": scene.dict(),
-                    "sora_prompt": sora_prompt,
+                    "sora_prompt": outputs["sora_prompt"],
                     "sora_video": sora_video.model_dump() if sora_video else None,
-                    "final_video_path": final_video_path,
+                    "sora_video_cached": sora_video is None,
+                    "clip_path": clip_path,
+                    "audio_path": outputs["audio"][0],
                 }
+                if mux:
+                    result["final_video_path"] = outputs["final_video_path"]
+                return rendered(result)
         except asyncio.TimeoutError:
-            error_msg = f"✗ Scene {scene_index} timed out after 600 seconds"
+            error_msg = f"✗ Scene {scene_index} timed out after {SCENE_TIMEOUT_SECONDS} seconds"
             print(error_msg)
+            record("error", error_msg)
+            failed(error_msg)
             return {
                 "scene_index": scene_index,
                 "scene": scene.model_dump(),
@@ -80,6 +247,8 @@ async def process_scene(scene: Scene, scene_index: int):
                 f"✗ Error processing scene {scene_index}: {type(e).__name__}: {str(e)}"
             )
             print(error_msg)
+            record("error", str(e))
+            failed(str(e))
             return {
                 "scene_index": scene_index,
                 "scene": scene.model_dump(),
@@ -87,118 +256,625 @@ async def process_scene(scene: Scene, scene_index: int):
             }
 
 
-@app.get("/latest")
-async def latest_articles(
-    url: str = Query(..., description="Website to look for articles"),
-):
+class Articles(BaseModel):
+    summaries: dict[str, str]
+    status: str
+
+
+async def run_latest_articles(url: str, job: Job | None = None) -> dict:
     print(f"Working on: {url}")
+    if job:
+        job.set_stage("summarizing")
     summaries: dict[str, str] | None = await get_latest_articles_and_summarize(
         url, num_articles=NUM_RECENT_ARTICLES, max_summary_length=MAX_SUMMARY_LENGTH
     )
 
     if not summaries:
         result = Articles(status="failed", summaries={})
-        return JSONResponse(content=result)
+        return result.model_dump()
 
     result = Articles(status="success", summaries=summaries)
+    if job:
+        for article_url, summary in summaries.items():
+            job.emit("summary_ready", article_url=article_url, summary=summary)
 
-    now = datetime.now()
-    formatted_now = now.strftime("%Y-%m-%d_%H:%M:%S")
-    parent_path = Path(__file__).parent / "../summaries"
+    summary_store.add_summaries(url, summaries)
 
-    with open(f"{parent_path}/{url.replace('/', '-')}_{formatted_now}.json", "w") as f:
-        json.dump(summaries, f)
+    return await run_generate_video(result, job)
 
-    return await generate_video(result)
 
+def latest_succeeded(result: dict) -> bool:
+    """Whether a /latest result has a complete reel for every article and is worth serving again"""
+    if not result or result.get("status") == "failed":
+        return False
+    return all(reel_succeeded(article) for article in result.values())
 
-@app.get("/summarize")
-async def summarize(
-    url: str = Query(..., description="URL to summarize"),
-):
-    print(f"Working on: {url}")
 
-    result: dict[str, str] = await concurrent_summarize(
-        [url], max_summary_length=MAX_SUMMARY_LENGTH
+async def prefetch_latest(url: str) -> dict:
+    """Run /latest for a registered source ahead of the users asking for it"""
+    result = await run_latest_articles(url)
+    # Raising keeps the source's previous result, e.g. through a Sora or ElevenLabs outage
+    if not latest_succeeded(result):
+        raise RuntimeError("No articles found or some reels failed to render")
+    return result
+
+
+prefetch_scheduler = PrefetchScheduler(prefetch_latest)
+
+
+def article_key(article_url: str) -> str:
+    return cache_key(article_url)[:16]
+
+
+def article_scope(reel_id: str) -> str:
+    return f"article-{reel_id}"
+
+
+def scene_file_name(scene_index: int) -> str:
+    return f"scene_{scene_index}.mp4"
+
+
+async def generate_article_video(
+    article_url: str, content: str, job: Job | None = None, use_memo: bool = True
+) -> dict | None:
+    """
+    Run one article through scene conversion, scene rendering and concatenation.
+
+    Scenes are rendered through the shared scene pool, so scenes from every
+    article in a request compete for the same slots instead of one article
+    waiting for the previous one to finish. Every stage output is checkpointed,
+    so resubmitting the same article only redoes the stages that failed.
+    Concurrent requests for the same article and content share one render.
+    use_memo=False skips a reel memoized from a render that just finished.
+    Intermediates go to the article's workspace scope and the final reel is
+    persisted to the reels directory.
+
+    Returns:
+        The structured result for the article, or None if scene conversion failed
+    """
+    rendered_here = False
+
+    async def render() -> dict | None:
+        nonlocal rendered_here
+        rendered_here = True
+        reel_id = article_key(article_url)
+        with workspace.scope(article_scope(reel_id)) as directory:
+            # Scenes from an earlier render may not exist in this one, don't keep serving them.
+            # Older versions also persisted them next to the reel.
+            stale = [*directory.glob("scene_*.mp4"), *workspace.reels_dir.glob(f"{reel_id}_scene_*.mp4")]
+            for path in stale:
+                path.unlink(missing_ok=True)
+            return await _render_article_video(article_url, content, job)
+
+    key = cache_key(article_url, content)
+    if job and article_flight.is_in_flight(key):
+        job.update_article(article_url, "rendering")
+    result = await article_flight.do(key, render, use_memo)
+    if rendered_here or not job:
+        return result
+
+    # Another request rendered this article, its scene-level progress went to that job
+    if result is None or "error" in result:
+        error = result["error"] if result else "Scene generation failed"
+        job.update_article(article_url, "failed", error)
+    else:
+        job.update_article(article_url, "done")
+        job.emit(
+            "reel_concatenated",
+            article_url=article_url,
+            reel_url=result["reel_url"],
+            hls_url=result["hls_url"],
+        )
+    return result
+
+
+async def _render_article_video(
+    article_url: str, content: str, job: Job | None = None
+) -> dict | None:
+    checkpoint = checkpoint_store.load_or_create(article_url, content)
+
+    if checkpoint.scenes is None:
+        if job:
+            job.update_article(article_url, "converting")
+        async with scene_conversion_semaphore:
+            scenes = await convert_to_scenes(
+                content,
+            )
+        if not scenes:
+            print(f"Scene generation fail for {article_url}")
+            if job:
+                job.update_article(article_url, "failed", "Scene generation failed")
+            return None
+
+        checkpoint.scenes = scenes.scenes
+        checkpoint_store.save(checkpoint)
+
+    if job:
+        job.update_article(article_url, "rendering")
+        job.emit(
+            "scenes_planned", article_url=article_url, num_scenes=len(checkpoint.scenes)
+        )
+        for idx in range(len(checkpoint.scenes)):
+            job.update_scene(article_url, idx, "pending")
+
+    # In single-pass mode scenes skip the per-scene mux, render_reel does it all at once
+    single_pass = REEL_RENDER_MODE == "single_pass"
+
+    # Process scenes with return_exceptions=True so failures don't block others
+    processed_scenes = await asyncio.gather(
+        *[
+            process_scene(scene, idx, job, article_url, checkpoint, mux=not single_pass)
+            for idx, scene in enumerate(checkpoint.scenes)
+        ],
+        return_exceptions=True,
     )
 
-    if len(result):
-        result["status"] = "success"
+    # Filter out exceptions and failed scenes
+    rendered_scenes = []
+    valid_scenes = []
+    for idx, result in enumerate(processed_scenes):
+        if isinstance(result, Exception):
+            print(f"✗ Scene {idx} raised exception: {type(result).__name__}: {result}")
+            valid_scenes.append(
+                {
+                    "scene_index": idx,
+                    "error": f"{type(result).__name__}: {str(result)}",
+                }
+            )
+        elif isinstance(result, dict) and "error" in result:
+            print(f"✗ Scene {idx} failed: {result['error']}")
+            valid_scenes.append(result)
+        elif isinstance(result, dict) and "clip_path" in result:
+            rendered_scenes.append(result)
+            valid_scenes.append(result)
+        else:
+            print(f"✗ Scene {idx} returned unexpected result: {result}")
+            valid_scenes.append({"scene_index": idx, "error": "Unexpected result format"})
+
+    if not rendered_scenes:
+        print(f"✗ No valid videos generated for {article_url}")
+        if job:
+            job.update_article(article_url, "failed", "All scenes failed to process")
+        return {
+            "error": "All scenes failed to process",
+            "scenes": valid_scenes,
+        }
+
+    if job:
+        job.update_article(article_url, "concatenating")
+    if single_pass:
+        final_video = await render_reel(
+            [(scene["clip_path"], scene["audio_path"]) for scene in rendered_scenes]
+        )
     else:
-        result = {}
-        result["status"] = "failed"
+        print(f"✓ Concatenating {len(rendered_scenes)} videos...")
+        final_video = await concatenate_videos(
+            [scene["final_video_path"] for scene in rendered_scenes]
+        )
+    reel_id = article_key(article_url)
+    final_video = workspace.persist(final_video, f"{reel_id}.mp4")
+    print(f"✓ Final video created: {final_video}")
+    if HLS_ON_RENDER:
+        await ensure_hls(reel_id)
+    checkpoint.final_video_path = final_video
+    checkpoint_store.save(checkpoint)
+    reel_url = f"/reels/{reel_id}"
+    hls_url = f"/reels/{reel_id}/hls/index.m3u8"
+    summary_store.record_reel(
+        article_url,
+        reel_id,
+        {"final_video_path": final_video, "reel_url": reel_url, "hls_url": hls_url},
+        checkpoint.scenes,
+    )
+    if job:
+        job.update_article(article_url, "done")
+        job.emit(
+            "reel_concatenated", article_url=article_url, reel_url=reel_url, hls_url=hls_url
+        )
+
+    return {
+        "final_video_path": final_video,
+        "reel_url": reel_url,
+        "hls_url": hls_url,
+        "scenes": valid_scenes,
+    }
+
+
+async def run_generate_video(articles: Articles, job: Job | None = None) -> dict:
+    if job:
+        job.set_stage("generating")
+        for article_url in articles.summaries:
+            job.update_article(article_url, "pending")
+
+    # Start every article at once; their scenes share the same scene pool
+    article_urls = list(articles.summaries)
+    results = await asyncio.gather(
+        *[
+            generate_article_video(article_url, articles.summaries[article_url], job)
+            for article_url in article_urls
+        ],
+        return_exceptions=True,
+    )
 
+    # Keep the response grouped per article, in the order they were submitted
+    structured_articles = {}
+    for article_url, result in zip(article_urls, results):
+        if isinstance(result, Exception):
+            error_msg = f"{type(result).__name__}: {str(result)}"
+            print(f"✗ Article {article_url} failed: {error_msg}")
+            if job:
+                job.update_article(article_url, "failed", error_msg)
+            structured_articles[article_url] = {"error": error_msg, "scenes": []}
+        elif result is not None:
+            structured_articles[article_url] = result
+
+    return structured_articles
+
+
+async def run_resume_article(article_url: str, job: Job | None = None) -> dict:
+    checkpoint = checkpoint_store.load(article_url)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="No checkpoint for this article")
+
+    failed_scenes = checkpoint.failed_scene_indices(mux=REEL_RENDER_MODE != "single_pass")
+    print(f"Resuming {article_url}, re-running scenes {failed_scenes}")
+    if job:
+        job.set_stage("generating")
+
+    # Resuming is explicit, always re-render instead of returning a memoized reel
+    result = await generate_article_video(article_url, checkpoint.content, job, use_memo=False)
+    if result is None:
+        result = {"error": "Scene generation failed", "scenes": []}
+    return {article_url: result}
+
+
+@app.get("/latest")
+async def latest_articles(
+    url: str = Query(..., description="Website to look for articles"),
+    refresh: bool = Query(False, description="Skip the prefetched result"),
+):
+    # Registered sources are refreshed in the background, serve that while it is fresh
+    if not refresh:
+        result = prefetch_scheduler.fresh_result(url)
+        if result is not None:
+            return JSONResponse(content=result)
+
+    result = await run_latest_articles(url)
+    if latest_succeeded(result):
+        prefetch_scheduler.record_result(url, result)
     return JSONResponse(content=result)
 
 
-class Articles(BaseModel):
-    summaries: dict[str, str]
-    status: str
+@app.get("/summarize")
+async def summarize(
+    url: list[str] = Query(..., description="URLs to summarize, repeat for several"),
+):
+    """Stream a summary_ready or summary_failed event per URL as soon as its agent finishes"""
+    urls = list(dict.fromkeys(url))
+    print(f"Working on: {urls}")
+
+    async def events():
+        num_successful = 0
+        async for article_url, summary in summarize_as_completed(
+            urls, max_summary_length=MAX_SUMMARY_LENGTH
+        ):
+            if summary.successful:
+                num_successful += 1
+                yield sse_event(
+                    "summary_ready", {"url": article_url, "summary": summary.summary}
+                )
+            else:
+                yield sse_event("summary_failed", {"url": article_url})
+
+        status = "success" if num_successful else "failed"
+        yield sse_event("summaries_finished", {"status": status})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
 
 
 @app.post("/sora")
 async def generate_video(articles: Articles):
-    # result = await get_latest_articles(url)
+    result = await run_generate_video(articles)
+    return JSONResponse(content=result)
 
-    structured_articles = {}
-    for article_url, content in articles.summaries.items():
-        scenes = await convert_to_scenes(
-            content,
-        )
-        if not scenes:
-            print(f"Scene generation fail for {article_url}")
-            continue
 
-        # Process scenes with return_exceptions=True so failures don't block others
-        processed_scenes = await asyncio.gather(
-            *[process_scene(scene, idx) for idx, scene in enumerate(scenes.scenes)],
-            return_exceptions=True,
+@app.post("/resume")
+async def resume_article(
+    article_url: str = Query(..., description="Article to resume from its checkpoint"),
+):
+    result = await run_resume_article(article_url)
+    return JSONResponse(content=result)
+
+
+def enqueue_job(kind: str, func) -> Job:
+    try:
+        return job_manager.submit(kind, func)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def submit_job(kind: str, func) -> JSONResponse:
+    job = enqueue_job(kind, func)
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "status": job.status.value},
+    )
+
+
+@app.post("/jobs/latest")
+async def submit_latest_articles(
+    url: str = Query(..., description="Website to look for articles"),
+):
+    return submit_job("latest", lambda job: run_latest_articles(url, job))
+
+
+@app.post("/jobs/sora")
+async def submit_generate_video(articles: Articles):
+    return submit_job("sora", lambda job: run_generate_video(articles, job))
+
+
+@app.post("/jobs/resume")
+async def submit_resume_article(
+    article_url: str = Query(..., description="Article to resume from its checkpoint"),
+):
+    if checkpoint_store.load(article_url) is None:
+        raise HTTPException(status_code=404, detail="No checkpoint for this article")
+    return submit_job("resume", lambda job: run_resume_article(article_url, job))
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return JSONResponse(content=job.model_dump(mode="json", exclude={"result"}))
+
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job.status == JobStatus.FAILED:
+        return JSONResponse(
+            status_code=500,
+            content={"job_id": job.id, "status": job.status.value, "error": job.error},
+        )
+    if job.status != JobStatus.SUCCEEDED:
+        return JSONResponse(
+            status_code=202,
+            content={"job_id": job.id, "status": job.status.value},
         )
 
-        # Filter out exceptions and failed scenes
-        final_videos = []
-        valid_scenes = []
-        for idx, result in enumerate(processed_scenes):
-            if isinstance(result, Exception):
-                print(
-                    f"✗ Scene {idx} raised exception: {type(result).__names__}: {result}"
-                )
-                valid_scenes.append(
-                    {
-                        "scene_index": idx,
-                        "error": f"{type(result).__name__}: {str(result)}",
-                    }
-                )
-            elif isinstance(result, dict) and "error" in result:
-                print(f"✗ Scene {idx} failed: {result['error']}")
-                valid_scenes.append(result)
-            elif isinstance(result, dict) and "final_video_path" in result:
-                final_videos.append(result["final_video_path"])
-                valid_scenes.append(result)
+    return JSONResponse(content=job.result)
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_response(job: Job) -> StreamingResponse:
+    """
+    Stream a job's progress events as Server-Sent Events.
+
+    Events are replayed from the start of the job, so reconnecting clients
+    catch up, and the stream closes after the job_finished event.
+    """
+
+    async def events():
+        yield sse_event("job_submitted", {"job_id": job.id, "kind": job.kind})
+        async for event in job.stream_events(heartbeat=SSE_HEARTBEAT_SECONDS):
+            if event is None:
+                yield ": keepalive\n\n"
             else:
-                print(f"✗ Scene {idx} returned unexpected result: {result}")
-                valid_scenes.append(
-                    {"scene_index": idx, "error": "Unexpected result format"}
-                )
+                yield sse_event(event["event"], event["data"])
 
-        if not final_videos:
-            print(f"✗ No valid videos generated for {article_url}")
-            structured_articles[article_url] = {
-                "error": "All scenes failed to process",
-                "scenes": valid_scenes,
-            }
-            continue
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
 
-        print(f"✓ Concatenating {len(final_videos)} videos...")
-        final_video = await concatenate_videos(final_videos)
-        print(f"✓ Final video created: {final_video}")
 
-        structured_articles[article_url] = {
-            "final_video_path": final_video,
-            "scenes": valid_scenes,
-        }
+@app.get("/latest/stream")
+async def stream_latest_articles(
+    url: str = Query(..., description="Website to look for articles"),
+):
+    return sse_response(enqueue_job("latest", lambda job: run_latest_articles(url, job)))
+
+
+@app.post("/sora/stream")
+async def stream_generate_video(articles: Articles):
+    return sse_response(enqueue_job("sora", lambda job: run_generate_video(articles, job)))
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
 
-    return JSONResponse(content=structured_articles)
+    return sse_response(job)
+
+
+class SourceRegistration(BaseModel):
+    source_url: str
+    source_type: str = "url"
+    scrape_frequency: str = "daily"
+    interval_seconds: float | None = None
+    is_active: bool = True
+
+
+@app.post("/sources")
+async def register_source(source: SourceRegistration):
+    try:
+        registered = prefetch_scheduler.register(**source.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(content=asdict(registered))
+
+
+@app.get("/sources")
+async def list_sources():
+    return JSONResponse(content=[asdict(source) for source in prefetch_scheduler.sources()])
+
+
+@app.delete("/sources")
+async def unregister_source(
+    url: str = Query(..., description="Source to stop prefetching"),
+):
+    if not prefetch_scheduler.unregister(url):
+        raise HTTPException(status_code=404, detail="Source not registered")
+    return Response(status_code=204)
+
+
+@app.get("/sources/history")
+async def source_history(
+    url: str = Query(..., description="Source to page through"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+):
+    try:
+        items, next_cursor = summary_store.source_history(url, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return JSONResponse(content={"items": items, "next_cursor": next_cursor})
+
+
+@app.get("/articles")
+async def article_details(
+    url: str = Query(..., description="Article URL"),
+):
+    article = summary_store.article(url)
+    if article is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return JSONResponse(content=article)
+
+
+REEL_ID_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+HLS_FILE_PATTERN = re.compile(r"^(index\.m3u8|segment_\d+\.ts)$")
+
+hls_locks: dict[str, asyncio.Lock] = {}
+
+
+def get_reel_path(reel_id: str) -> Path:
+    if not REEL_ID_PATTERN.match(reel_id):
+        raise HTTPException(status_code=404, detail="Reel not found")
+
+    path = workspace.reels_dir / f"{reel_id}.mp4"
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Reel not found")
+    return path
+
+
+def file_etag(path: Path) -> str:
+    stat = path.stat()
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match check: "*" or any listed tag, compared weakly as RFC 9110 requires"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in tags)
+
+
+def serve_file(request: Request, path: Path, media_type: str) -> Response:
+    """FileResponse with a strong ETag; Range requests are handled by Starlette"""
+    etag = file_etag(path)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers={"ETag": etag, "Cache-Control": "public, max-age=3600"},
+    )
+
+
+async def ensure_hls(reel_id: str) -> Path:
+    """Segment a reel for HLS once, re-segmenting only if the reel was re-rendered"""
+    reel_path = get_reel_path(reel_id)
+    hls_dir = workspace.reels_dir / f"{reel_id}_hls"
+    playlist_path = hls_dir / "index.m3u8"
+
+    async with hls_locks.setdefault(reel_id, asyncio.Lock()):
+        if (
+            playlist_path.exists()
+            and playlist_path.stat().st_mtime >= reel_path.stat().st_mtime
+        ):
+            return hls_dir
+
+        # Segment into a side directory and swap it in, so readers never see a partial playlist
+        temp_dir = workspace.reels_dir / f"{reel_id}_hls.part"
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        await segment_hls(str(reel_path), str(temp_dir), HLS_SEGMENT_SECONDS)
+        shutil.rmtree(hls_dir, ignore_errors=True)
+        os.replace(temp_dir, hls_dir)
+
+    return hls_dir
+
+
+@app.get("/reels/{reel_id}")
+async def stream_reel(reel_id: str, request: Request):
+    return serve_file(request, get_reel_path(reel_id), "video/mp4")
+
+
+@app.get("/reels/{reel_id}/scenes/{scene_index}")
+async def stream_reel_scene(reel_id: str, scene_index: int, request: Request):
+    if not REEL_ID_PATTERN.match(reel_id):
+        raise HTTPException(status_code=404, detail="Scene not found")
+
+    path = workspace.scope_dir(article_scope(reel_id)) / scene_file_name(scene_index)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Scene not found")
+    return serve_file(request, path, "video/mp4")
+
+
+@app.get("/reels/{reel_id}/hls/{file_name}")
+async def stream_reel_hls(reel_id: str, file_name: str, request: Request):
+    if not HLS_FILE_PATTERN.match(file_name):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    hls_dir = await ensure_hls(reel_id)
+    path = hls_dir / file_name
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="File not found")
+
+    media_type = (
+        "application/vnd.apple.mpegurl" if file_name.endswith(".m3u8") else "video/mp2t"
+    )
+    return serve_file(request, path, media_type)
+
+
+@app.get("/stats")
+async def stats():
+    return JSONResponse(
+        content={
+            "caches": {
+                "tts": tts_cache.stats(),
+                "sora_prompts": sora_prompt_cache.stats(),
+                "sora_clips": sora_clip_cache.stats(),
+            },
+            "workspace": workspace.stats(),
+            "browser_pool": browser_pool.stats(),
+            "source_index": source_index.stats(),
+            "summary_store": summary_store.stats(),
+            "prefetch": prefetch_scheduler.stats(),
+            "limiters": {name: limiter.stats() for name, limiter in limiters.items()},
+            "coalescing": {
+                flight.name: flight.stats()
+                for flight in (latest_flight, summary_flight, sora_clip_flight, article_flight)
+            },
+        }
+    )
 
 
 if __name__ == "__main__":
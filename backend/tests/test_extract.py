@@ -0,0 +1,119 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import unittest
+
+import httpx
+
+from utils.extract import MIN_ARTICLE_CHARS, extract_article, extract_main_text
+
+
+PARAGRAPH = "Reely turns the latest articles of a source into short reels, one scene per idea, with a voice-over."
+ARTICLE = f"""
+<html>
+  <head><title>Fixture article</title></head>
+  <body>
+    <nav class="menu"><p>Home, Blog, About, Contact, Careers, Press, Newsletter</p></nav>
+    <article class="post-content">{f"<p>{PARAGRAPH}</p>" * 8}</article>
+    <aside class="sidebar"><p>Related posts, popular posts, and everything else on the side</p></aside>
+  </body>
+</html>
+"""
+BOT_WALL = f"""
+<html><body><main>
+  <p>Please verify you are human to continue reading this article, it only takes a second.</p>
+  {f"<p>{PARAGRAPH}</p>" * 5}
+</main></body></html>
+"""
+
+ROUTES = {
+    "/article": ("text/html; charset=utf-8", ARTICLE),
+    "/short": ("text/html; charset=utf-8", f"<html><body><main><p>{PARAGRAPH}</p></main></body></html>"),
+    "/bot-wall": ("text/html; charset=utf-8", BOT_WALL),
+    "/feed.json": ("application/json", '{"items": []}'),
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in ROUTES:
+            self.send_error(404)
+            return
+        content_type, body = ROUTES[self.path]
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ExtractMainTextTest(unittest.TestCase):
+    def test_keeps_the_article_and_drops_boilerplate(self):
+        title, text = extract_main_text(ARTICLE)
+        self.assertEqual(title, "Fixture article")
+        self.assertEqual(text.splitlines(), [PARAGRAPH] * 8)
+
+    def test_unclosed_paragraphs_are_kept(self):
+        _, text = extract_main_text(f"<p>{PARAGRAPH}<p>{PARAGRAPH}")
+        self.assertEqual(text.splitlines(), [PARAGRAPH] * 2)
+
+    def test_unclosed_list_items_and_cells_are_kept_apart(self):
+        cases = {
+            "list": f"<ul><li>{PARAGRAPH}<li>{PARAGRAPH}<li>{PARAGRAPH}</ul>",
+            "definitions": f"<dl><dt>{PARAGRAPH}<dd>{PARAGRAPH}<dt>{PARAGRAPH}</dl>",
+            "table": f"<table><tr><td>{PARAGRAPH}<td>{PARAGRAPH}<td>{PARAGRAPH}<tr><td>Total</table>",
+        }
+        for name, html in cases.items():
+            with self.subTest(name):
+                _, text = extract_main_text(html)
+                self.assertEqual(text.splitlines(), [PARAGRAPH] * 3)
+
+    def test_nested_list_items_are_not_glued(self):
+        _, text = extract_main_text(f"<ul><li>{PARAGRAPH}<ul><li>{PARAGRAPH}</ul><li>{PARAGRAPH}</ul>")
+        self.assertEqual(text.splitlines(), [f"{PARAGRAPH} {PARAGRAPH}", PARAGRAPH])
+
+
+class ExtractArticleTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    async def asyncSetUp(self):
+        self.client = httpx.AsyncClient()
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def test_extracts_article(self):
+        article = await extract_article(f"{self.base_url}/article", self.client)
+        self.assertIsNotNone(article)
+        self.assertEqual(article.url, f"{self.base_url}/article")
+        self.assertEqual(article.title, "Fixture article")
+        self.assertGreaterEqual(len(article.text), MIN_ARTICLE_CHARS)
+        self.assertNotIn("Related posts", article.text)
+
+    async def test_short_text_needs_a_browser(self):
+        self.assertIsNone(await extract_article(f"{self.base_url}/short", self.client))
+
+    async def test_bot_wall_needs_a_browser(self):
+        self.assertIsNone(await extract_article(f"{self.base_url}/bot-wall", self.client))
+
+    async def test_non_html_needs_a_browser(self):
+        self.assertIsNone(await extract_article(f"{self.base_url}/feed.json", self.client))
+
+    async def test_error_status_needs_a_browser(self):
+        self.assertIsNone(await extract_article(f"{self.base_url}/missing", self.client))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+import asyncio
+import os
+
+from browser_use import Browser
+
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", 3))
+BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", 10))  # Tasks per browser before it is relaunched
+BROWSER_HEADLESS = os.getenv("BROWSER_HEADLESS", "1") == "1"
+BROWSER_HEALTH_CHECK_TIMEOUT = 5
+BROWSER_RESET_TIMEOUT = 10
+
+
+class PooledBrowser:
+    def __init__(self, headless: bool):
+        # No user_data_dir, so every launch gets its own throwaway profile
+        self.browser = Browser(headless=headless, keep_alive=True)
+        self.uses = 0
+
+    async def start(self):
+        await self.browser.start()
+
+    async def is_healthy(self) -> bool:
+        try:
+            async with asyncio.timeout(BROWSER_HEALTH_CHECK_TIMEOUT):
+                await self.browser.get_current_page_url()
+            return True
+        except Exception:
+            return False
+
+    async def reset(self):
+        """
+        Clear what the last task left behind before the next one gets the browser.
+
+        Site storage is cleared for every origin that has a cookie or an open
+        tab, then all cookies, and every tab but the focused one is closed and
+        that one is sent to about:blank.
+        """
+        cdp = self.browser.cdp_client
+        async with asyncio.timeout(BROWSER_RESET_TIMEOUT):
+            targets = self.browser.get_page_targets()
+            origins = set()
+            for target in targets:
+                parts = urlsplit(target.url)
+                if parts.scheme in ("http", "https"):
+                    origins.add(f"{parts.scheme}://{parts.netloc}")
+            cookies = (await cdp.send.Storage.getCookies()).get("cookies", [])
+            for cookie in cookies:
+                domain = cookie["domain"].lstrip(".")
+                origins.update((f"https://{domain}", f"http://{domain}"))
+            for origin in origins:
+                await cdp.send.Storage.clearDataForOrigin(
+                    params={"origin": origin, "storageTypes": "all"}
+                )
+            await self.browser.clear_cookies()
+
+            keep = self.browser.agent_focus_target_id or (targets[0].target_id if targets else None)
+            for target in targets:
+                if target.target_id != keep:
+                    await self.browser.close_page(target.target_id)
+            await self.browser.navigate_to("about:blank")
+
+    async def close(self):
+        try:
+            await self.browser.kill()
+        except Exception as e:
+            print(f"✗ Failed to close browser: {type(e).__name__}: {str(e)}")
+
+
+class BrowserPool:
+    """
+    Fixed-size pool of warm browsers shared by the browser-use agents.
+
+    Each task gets a browser to itself for the duration of the borrow. When
+    it is returned, its cookies, site storage and extra tabs are cleared, so
+    the next task starts logged out on a single blank tab. Browsers are
+    relaunched with a fresh profile after max_uses tasks, after a task fails,
+    when the reset fails, or when they stop responding, so a crashed Chromium
+    never gets handed out.
+
+    Args:
+        size: Number of browsers kept running
+        max_uses: Number of tasks a browser serves before it is relaunched
+        headless: Whether to run the browsers without a window
+    """
+
+    def __init__(self, size: int, max_uses: int, headless: bool = True):
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self.launches = 0
+        self.recycles = 0
+        self._idle: asyncio.Queue[PooledBrowser | None] = asyncio.Queue()
+        self._started = False
+        self._replacements: set[asyncio.Task] = set()
+
+    async def _launch(self) -> PooledBrowser:
+        browser = PooledBrowser(self.headless)
+        await browser.start()
+        self.launches += 1
+        return browser
+
+    async def start(self):
+        """Launch every browser up front so the first requests don't pay the cold start"""
+        if self._started:
+            return
+        self._started = True
+        browsers = await asyncio.gather(
+            *[self._launch() for _ in range(self.size)], return_exceptions=True
+        )
+        for browser in browsers:
+            if isinstance(browser, Exception):
+                print(f"✗ Failed to launch browser: {type(browser).__name__}: {str(browser)}")
+                # Leave the slot empty, it is relaunched when borrowed
+                browser = None
+            self._idle.put_nowait(browser)
+
+    async def stop(self):
+        await asyncio.gather(*self._replacements, return_exceptions=True)
+        while not self._idle.empty():
+            browser = self._idle.get_nowait()
+            if browser:
+                await browser.close()
+        self._started = False
+
+    async def _recycle(self, browser: PooledBrowser | None) -> PooledBrowser:
+        if browser:
+            self.recycles += 1
+            await browser.close()
+        return await self._launch()
+
+    @asynccontextmanager
+    async def borrow(self):
+        """Wait for a free browser, yield it and return it to the pool afterwards"""
+        if not self._started:
+            await self.start()
+
+        browser = await self._idle.get()
+        try:
+            if browser is None or not await browser.is_healthy():
+                browser = await self._recycle(browser)
+        except BaseException:
+            self._idle.put_nowait(None)
+            raise
+
+        try:
+            yield browser.browser
+        except BaseException:
+            # The agent may have left the browser in any state, don't reuse it
+            self._replace_later(browser)
+            raise
+
+        browser.uses += 1
+        if browser.uses >= self.max_uses:
+            self._replace_later(browser)
+            return
+        try:
+            await browser.reset()
+        except Exception as e:
+            print(f"✗ Failed to reset browser: {type(e).__name__}: {str(e)}")
+            self._replace_later(browser)
+            return
+        except BaseException:
+            self._replace_later(browser)
+            raise
+        self._idle.put_nowait(browser)
+
+    def _replace_later(self, browser: PooledBrowser):
+        """Relaunch in the background so the caller isn't held up by it"""
+        task = asyncio.create_task(self._replace(browser))
+        self._replacements.add(task)
+        task.add_done_callback(self._replacements.discard)
+
+    async def _replace(self, browser: PooledBrowser):
+        try:
+            replacement = await self._recycle(browser)
+        except Exception as e:
+            print(f"✗ Failed to relaunch browser: {type(e).__name__}: {str(e)}")
+            replacement = None
+        self._idle.put_nowait(replacement)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "launches": self.launches,
+            "recycles": self.recycles,
+        }
+
+
+browser_pool = BrowserPool(BROWSER_POOL_SIZE, BROWSER_MAX_USES, BROWSER_HEADLESS)
@@ -0,0 +1,187 @@
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+
+CACHE_ROOT = Path(os.getenv("REELY_CACHE_DIR", Path(__file__).resolve().parent.parent / "cache"))
+
+
+def cache_key(*parts) -> str:
+    """Content hash of the given parts, used as a cache key"""
+    payload = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Content-addressed file cache with size-bounded LRU eviction.
+
+    Each entry is a file named after its key. The file's mtime records when
+    it was written (for the TTL) and its atime records the last hit (for LRU).
+
+    Args:
+        directory: Directory to store entries in
+        max_bytes: Total size above which least recently used entries are evicted
+        ttl_seconds: Optional age after which entries are treated as missing
+        suffix: File extension for entries (e.g. ".mp3")
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int,
+        ttl_seconds: float | None = None,
+        suffix: str = "",
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.suffix = suffix
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.total_bytes = sum(path.stat().st_size for path in self._entries())
+
+    def _entries(self):
+        return self.directory.glob(f"*/*{self.suffix}")
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}{self.suffix}"
+
+    def entry_path(self, key: str) -> Path:
+        """Where the entry for a key lives, whether or not it exists"""
+        return self._path(key)
+
+    def _is_expired(self, stat: os.stat_result) -> bool:
+        return self.ttl_seconds is not None and time.time() - stat.st_mtime > self.ttl_seconds
+
+    def get_path(self, key: str) -> Path | None:
+        """
+        Look up an entry and mark it as recently used.
+
+        Returns:
+            Path to the cached file, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        if self._is_expired(stat):
+            self._remove(path, stat.st_size)
+            self.misses += 1
+            return None
+
+        os.utime(path, (time.time(), stat.st_mtime))
+        self.hits += 1
+        return path
+
+    def get_bytes(self, key: str) -> bytes | None:
+        path = self.get_path(key)
+        return path.read_bytes() if path else None
+
+    def get_text(self, key: str) -> str | None:
+        path = self.get_path(key)
+        return path.read_text(encoding="utf-8") if path else None
+
+    def put_bytes(self, key: str, data: bytes) -> Path:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return self._commit(temp_path, path)
+
+    def put_text(self, key: str, text: str) -> Path:
+        return self.put_bytes(key, text.encode("utf-8"))
+
+    def put_file(self, key: str, source_path: str | Path, move: bool = False) -> Path:
+        """Copy (or move, if move=True) an existing file into the cache"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        os.close(fd)
+        if move:
+            shutil.move(source_path, temp_path)
+        else:
+            shutil.copyfile(source_path, temp_path)
+        return self._commit(temp_path, path)
+
+    @contextmanager
+    def open_for_write(self, key: str):
+        """
+        Open a new entry for incremental writes.
+
+        The entry only becomes visible, at entry_path(key), once the block
+        exits without an error. Yields the open binary file.
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self._commit(temp_path, path)
+
+    def _commit(self, temp_path: str, path: Path) -> Path:
+        if path.exists():
+            self.total_bytes -= path.stat().st_size
+        os.replace(temp_path, path)
+        self.total_bytes += path.stat().st_size
+
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+        return path
+
+    def _remove(self, path: Path, size: int):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        self.total_bytes -= size
+        self.evictions += 1
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if self._is_expired(stat):
+                self._remove(path, stat.st_size)
+            else:
+                entries.append((stat.st_atime, stat.st_size, path))
+
+        entries.sort()
+        for _, size, path in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._remove(path, size)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,109 @@
+from datetime import datetime
+from pathlib import Path
+from pydantic import BaseModel, Field
+import os
+import shutil
+import tempfile
+
+from utils.cache import CACHE_ROOT, cache_key
+from utils.scene_converter import Scene
+
+
+CHECKPOINT_DIR = CACHE_ROOT / "checkpoints"
+
+
+class SceneCheckpoint(BaseModel):
+    sora_prompt: str | None = None
+    clip_path: str | None = None
+    audio_path: str | None = None
+    final_video_path: str | None = None
+    error: str | None = None
+
+
+class ArticleCheckpoint(BaseModel):
+    article_url: str
+    content: str
+    scenes: list[Scene] | None = None
+    scene_outputs: dict[int, SceneCheckpoint] = Field(default_factory=dict)
+    final_video_path: str | None = None
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    def scene_output(self, scene_index: int, field: str) -> str | None:
+        """
+        Stored output of a scene stage, or None if it must be recomputed.
+
+        File outputs only count if the file still exists on disk.
+        """
+        output = self.scene_outputs.get(scene_index)
+        value = getattr(output, field) if output else None
+        if value and field.endswith("_path") and not os.path.exists(value):
+            return None
+        return value
+
+    def scene_done(self, scene_index: int, mux: bool = True) -> bool:
+        """Whether a scene has every output its render mode needs"""
+        if mux:
+            return self.scene_output(scene_index, "final_video_path") is not None
+        return (
+            self.scene_output(scene_index, "clip_path") is not None
+            and self.scene_output(scene_index, "audio_path") is not None
+        )
+
+    def failed_scene_indices(self, mux: bool = True) -> list[int]:
+        if not self.scenes:
+            return []
+        return [idx for idx in range(len(self.scenes)) if not self.scene_done(idx, mux)]
+
+
+class CheckpointStore:
+    """
+    Per-article checkpoints of every stage output, stored as JSON on disk.
+
+    A checkpoint is keyed on the article URL and only reused while the article
+    content is unchanged, so resubmitting or resuming an article skips every
+    stage that already succeeded.
+    """
+
+    def __init__(self, directory: str | Path = CHECKPOINT_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def article_dir(self, article_url: str) -> Path:
+        return self.directory / cache_key(article_url)
+
+    def _path(self, article_url: str) -> Path:
+        return self.article_dir(article_url) / "checkpoint.json"
+
+    def load(self, article_url: str) -> ArticleCheckpoint | None:
+        path = self._path(article_url)
+        if not path.exists():
+            return None
+        return ArticleCheckpoint.model_validate_json(path.read_text(encoding="utf-8"))
+
+    def load_or_create(self, article_url: str, content: str) -> ArticleCheckpoint:
+        checkpoint = self.load(article_url)
+        if checkpoint is not None and checkpoint.content == content:
+            return checkpoint
+
+        # New or changed article, drop anything stored for the old content
+        shutil.rmtree(self.article_dir(article_url), ignore_errors=True)
+        checkpoint = ArticleCheckpoint(article_url=article_url, content=content)
+        self.save(checkpoint)
+        return checkpoint
+
+    def save(self, checkpoint: ArticleCheckpoint):
+        checkpoint.updated_at = datetime.now()
+        path = self._path(checkpoint.article_url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(checkpoint.model_dump_json())
+        os.replace(temp_path, path)
+
+    def set_scene_output(
+        self, checkpoint: ArticleCheckpoint, scene_index: int, field: str, value: str | None
+    ):
+        output = checkpoint.scene_outputs.setdefault(scene_index, SceneCheckpoint())
+        setattr(output, field, value)
+        self.save(checkpoint)
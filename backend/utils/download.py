@@ -0,0 +1,99 @@
+from typing import AsyncContextManager, Callable
+import asyncio
+import hashlib
+import os
+
+from utils.rate_limit import get_status_code
+
+
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024  # 1MB per read and write
+DOWNLOAD_MAX_RETRIES = 3
+
+
+class DownloadError(Exception):
+    pass
+
+
+def _total_size(response, offset: int) -> int | None:
+    """Full size of the resource from Content-Range, or Content-Length plus the resume offset"""
+    content_range = response.headers.get("content-range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+
+    content_length = response.headers.get("content-length")
+    return offset + int(content_length) if content_length else None
+
+
+async def download_to_file(
+    open_stream: Callable[[int], AsyncContextManager],
+    destination: str,
+    buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+    max_retries: int = DOWNLOAD_MAX_RETRIES,
+    expected_sha256: str | None = None,
+) -> str:
+    """
+    Download a streamed response to a file, resuming with HTTP ranges on failure.
+
+    Args:
+        open_stream: Called with the byte offset to resume from, returns an async
+            context manager yielding a streamed response (status_code, headers,
+            iter_bytes). It should send "Range: bytes=<offset>-" when offset > 0.
+        destination: Path to write the file to
+        buffer_size: Chunk size for reads and writes
+        max_retries: Number of times to resume after an interrupted transfer
+        expected_sha256: Optional checksum the finished file must match
+
+    Returns:
+        The destination path
+
+    Raises:
+        DownloadError: If the size or checksum doesn't match, or retries run out
+    """
+    offset = 0
+    total_size = None
+    checksum = hashlib.sha256()
+
+    with open(destination, "wb") as f:
+        for attempt in range(max_retries + 1):
+            try:
+                async with open_stream(offset) as response:
+                    if offset and response.status_code != 206:
+                        # Server ignored the range, start over from the beginning
+                        print("Server does not support range requests, restarting download")
+                        offset = 0
+                        checksum = hashlib.sha256()
+                        f.seek(0)
+                        f.truncate()
+
+                    total_size = _total_size(response, offset)
+                    async for chunk in response.iter_bytes(buffer_size):
+                        await asyncio.to_thread(f.write, chunk)
+                        checksum.update(chunk)
+                        offset += len(chunk)
+                break
+            except Exception as e:
+                status_code = get_status_code(e)
+                if status_code is not None and status_code < 500 and status_code != 429:
+                    raise
+                if attempt == max_retries:
+                    raise DownloadError(
+                        f"Download failed after {max_retries + 1} attempts: {str(e)}"
+                    ) from e
+
+                # Keep what was written so far and resume from there
+                await asyncio.to_thread(f.flush)
+                wait_time = 2**attempt
+                print(
+                    f"✗ Download interrupted at {offset} bytes ({str(e)}), "
+                    f"resuming in {wait_time} seconds..."
+                )
+                await asyncio.sleep(wait_time)
+
+    size = os.path.getsize(destination)
+    if total_size is not None and size != total_size:
+        raise DownloadError(f"Downloaded {size} bytes, expected {total_size}")
+    if expected_sha256 is not None and checksum.hexdigest() != expected_sha256:
+        raise DownloadError("Downloaded file does not match the expected checksum")
+
+    return destination
@@ -1,9 +1,80 @@
 from elevenlabs import AsyncElevenLabs
 import os
 
+from utils.cache import CACHE_ROOT, DiskCache, cache_key
+from utils.rate_limit import limiters
+
 
 client = AsyncElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
 
+TTS_OUTPUT_FORMAT = "mp3_44100_128"  # Constant bitrate, so duration follows from the size
+TTS_CACHE_MAX_BYTES = 500 * 1024 * 1024  # 500MB of cached voice-overs
+
+tts_cache = DiskCache(CACHE_ROOT / "tts", max_bytes=TTS_CACHE_MAX_BYTES, suffix=".mp3")
+
+
+def audio_duration(num_bytes: int, output_format: str = TTS_OUTPUT_FORMAT) -> float:
+    """
+    Duration in seconds of ElevenLabs audio, derived from its output format.
+
+    Args:
+        num_bytes: Size of the audio data
+        output_format: ElevenLabs output format, e.g. "mp3_44100_128" or "pcm_16000"
+
+    Returns:
+        Duration in seconds
+    """
+    codec, sample_rate, *rest = output_format.split("_")
+    if codec == "mp3":
+        bitrate = int(rest[0]) * 1000
+        return num_bytes * 8 / bitrate
+    if codec == "pcm":
+        # 16-bit mono
+        return num_bytes / (int(sample_rate) * 2)
+    raise ValueError(f"Cannot derive duration for output format {output_format}")
+
+
+async def text_to_speech_file(
+    text: str, voice: str = "rU18Fk3uSDhmg5Xh41o4", model: str = "eleven_turbo_v2_5"
+) -> tuple[str, float]:
+    """
+    Convert text to speech, streaming the audio straight to a file.
+
+    Chunks are written as they arrive instead of being buffered in memory,
+    and the file is stored in the TTS cache so identical voice-overs are
+    served without calling the API.
+
+    Args:
+        text: The text to convert to speech
+        voice: The voice ID or name to use (default: "Rachel")
+        model: The model to use (default: "eleven_turbo_v2_5")
+
+    Returns:
+        Tuple of (path to the mp3 file, duration in seconds)
+    """
+    key = cache_key(text, voice, model)
+    cached_path = tts_cache.get_path(key)
+    if cached_path is not None:
+        print("✓ Text to speech cache hit")
+        return str(cached_path), audio_duration(cached_path.stat().st_size)
+
+    print("Converting text to speech...")
+    num_bytes = 0
+    async with limiters["elevenlabs"].limit():
+        audio_generator = client.text_to_speech.convert(
+            text=text,
+            voice_id=voice,
+            model_id=model,
+            output_format=TTS_OUTPUT_FORMAT,
+        )
+
+        with tts_cache.open_for_write(key) as f:
+            async for chunk in audio_generator:
+                f.write(chunk)
+                num_bytes += len(chunk)
+
+    return str(tts_cache.entry_path(key)), audio_duration(num_bytes)
+
 
 async def text_to_speech(
     text: str, voice: str = "rU18Fk3uSDhmg5Xh41o4", model: str = "eleven_turbo_v2_5"
@@ -19,15 +90,6 @@ async def text_to_speech(
     Returns:
         Audio data as bytes
     """
-    print("Converting text to speech...")
-    audio_generator = client.text_to_speech.convert(
-        text=text,
-        voice_id=voice,
-        model_id=model,
-    )
-
-    audio_bytes = b""
-    async for chunk in audio_generator:
-        audio_bytes += chunk
-
-    return audio_bytes
+    audio_path, _ = await text_to_speech_file(text, voice, model)
+    with open(audio_path, "rb") as f:
+        return f.read()
@@ -0,0 +1,250 @@
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+import re
+
+import httpx
+
+from utils.http import get_http_client
+
+
+MIN_ARTICLE_CHARS = 500  # Less main text than this usually means a JS-rendered or blocked page
+MAX_ARTICLE_CHARS = 50_000  # Enough for any article, keeps the summarization prompt bounded
+
+# Pages that only render a placeholder without JavaScript, or a bot wall
+BLOCKED_PAGE_PATTERN = re.compile(
+    r"enable javascript|javascript is (disabled|required)|are you a robot|verify you are human"
+    r"|access denied|captcha",
+    re.IGNORECASE,
+)
+
+SKIPPED_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe",
+    "nav", "header", "footer", "aside", "form", "button", "select",
+}
+TEXT_TAGS = {"p", "pre", "blockquote", "li", "dt", "dd", "h1", "h2", "h3", "h4", "td"}
+# Start tag: (open tags it implicitly closes, containers the search stops at)
+IMPLIED_END_TAGS = {
+    "p": ({"p"}, set()),
+    "li": ({"li"}, {"ul", "ol"}),
+    "dt": ({"dt", "dd"}, {"dl"}),
+    "dd": ({"dt", "dd"}, {"dl"}),
+    "tr": ({"tr"}, {"table", "thead", "tbody", "tfoot"}),
+    "td": ({"td", "th"}, {"tr", "table"}),
+    "th": ({"td", "th"}, {"tr", "table"}),
+}
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+}
+
+POSITIVE_HINTS = re.compile(r"article|body|content|entry|main|post|story|text", re.IGNORECASE)
+NEGATIVE_HINTS = re.compile(
+    r"ad-|banner|comment|footer|menu|nav|promo|related|share|sidebar|social|sponsor|subscribe",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class _Node:
+    tag: str
+    hints: str
+    parent: "_Node | None"
+    score: float = 0.0
+    skipped: bool = False
+
+
+@dataclass
+class _Block:
+    text: str
+    ancestors: list[_Node] = field(default_factory=list)
+
+
+class _ReadabilityParser(HTMLParser):
+    """Collects text blocks with the element chain they were found in"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.blocks: list[_Block] = []
+        # Parent of top-level elements, so fragments without <html>/<body> still have a candidate
+        self._root = _Node("#document", "", None)
+        self._stack: list[_Node] = []
+        self._skip_depth = 0
+        self._in_title = False
+        self._text: list[str] | None = None
+        self._text_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag == "br" and self._text is not None:
+                self._text.append(" ")
+            return
+        if tag in IMPLIED_END_TAGS:
+            self._close_implied(tag)
+        if self._skip_depth or tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+            self._stack.append(_Node(tag, "", None, skipped=True))
+            return
+
+        attributes = dict(attrs)
+        hints = f"{attributes.get('id') or ''} {attributes.get('class') or ''}"
+        parent = self._stack[-1] if self._stack else self._root
+        self._stack.append(_Node(tag, hints, parent))
+
+        if tag == "title":
+            self._in_title = True
+        elif tag in TEXT_TAGS:
+            if self._text is None:
+                self._text = []
+                self._text_depth = len(self._stack)
+            else:
+                # Nested block, e.g. a sublist in a list item, keep its words apart
+                self._text.append(" ")
+
+    def _close_implied(self, tag):
+        """A new paragraph, list item or cell implicitly closes an unclosed sibling"""
+        closes, containers = IMPLIED_END_TAGS[tag]
+        for node in reversed(self._stack):
+            if node.tag in containers:
+                return
+            if node.tag in closes:
+                self.handle_endtag(node.tag)
+                return
+
+    def handle_endtag(self, tag):
+        # Tolerate unclosed elements by popping until the matching start tag
+        if not any(node.tag == tag for node in self._stack):
+            return
+        while self._stack:
+            depth = len(self._stack)
+            node = self._stack.pop()
+            if node.skipped:
+                self._skip_depth -= 1
+            if self._text is not None and depth == self._text_depth:
+                self._finish_block(node)
+            if node.tag == "title":
+                self._in_title = False
+            if node.tag == tag:
+                break
+
+    def close(self):
+        super().close()
+        # Close whatever the page left open, so a trailing unclosed paragraph isn't lost
+        while self._stack:
+            self.handle_endtag(self._stack[-1].tag)
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self.title += data
+        elif self._text is not None:
+            self._text.append(data)
+
+    def _finish_block(self, node: _Node):
+        text = " ".join("".join(self._text).split())
+        self._text = None
+        if not text:
+            return
+        ancestors = []
+        parent = node.parent
+        while parent is not None:
+            ancestors.append(parent)
+            parent = parent.parent
+        self.blocks.append(_Block(text, ancestors))
+
+
+def _hint_weight(node: _Node) -> float:
+    weight = 0.0
+    if node.tag in ("article", "main"):
+        weight += 25
+    if POSITIVE_HINTS.search(node.hints):
+        weight += 25
+    if NEGATIVE_HINTS.search(node.hints):
+        weight -= 25
+    return weight
+
+
+def extract_main_text(html: str) -> tuple[str, str]:
+    """
+    Readability-style extraction of a page's main content.
+
+    Each paragraph scores its parent and, at half weight, its grandparent
+    by length and number of commas. The best scoring element, adjusted by
+    id/class hints such as "article" or "sidebar", is taken as the article
+    body and its paragraphs are returned in document order.
+
+    Returns:
+        The page title and the main text, with one paragraph per line
+    """
+    parser = _ReadabilityParser()
+    parser.feed(html)
+    parser.close()
+
+    candidates: dict[int, _Node] = {}
+    for block in parser.blocks:
+        if len(block.text) < 25:
+            continue
+        score = 1 + block.text.count(",") + min(len(block.text) // 100, 3)
+        for level, node in enumerate(block.ancestors[:2]):
+            if id(node) not in candidates:
+                node.score = _hint_weight(node)
+                candidates[id(node)] = node
+            node.score += score / (level + 1)
+
+    title = " ".join(parser.title.split())
+    if not candidates:
+        return title, ""
+
+    best = max(candidates.values(), key=lambda node: node.score)
+    paragraphs = [
+        block.text
+        for block in parser.blocks
+        if any(node is best for node in block.ancestors)
+    ]
+    return title, "\n".join(paragraphs)[:MAX_ARTICLE_CHARS]
+
+
+@dataclass
+class ExtractedArticle:
+    url: str
+    title: str
+    text: str
+
+
+async def extract_article(
+    url: str, client: httpx.AsyncClient | None = None
+) -> ExtractedArticle | None:
+    """
+    Fetch a page over plain HTTP and extract its main text.
+
+    Returns:
+        The extracted article, or None if the page needs a real browser
+        (error status, non-HTML response, bot wall or too little text)
+    """
+    client = client or get_http_client()
+    try:
+        response = await client.get(url)
+    except httpx.HTTPError as e:
+        print(f"✗ Fast-path fetch of {url} failed: {type(e).__name__}: {str(e)}")
+        return None
+    return article_from_response(url, response)
+
+
+def article_from_response(url: str, response: httpx.Response) -> ExtractedArticle | None:
+    """Extract the main text of an already fetched page, with the same checks as extract_article()"""
+    if response.status_code >= 400:
+        print(f"✗ Fast-path fetch of {url} returned {response.status_code}")
+        return None
+    if "html" not in response.headers.get("content-type", ""):
+        return None
+
+    title, text = extract_main_text(response.text)
+    if len(text) < MIN_ARTICLE_CHARS:
+        print(f"✗ Fast path extracted only {len(text)} characters from {url}")
+        return None
+    if len(text) < 2 * MIN_ARTICLE_CHARS and BLOCKED_PAGE_PATTERN.search(text):
+        print(f"✗ Fast path hit a JavaScript or bot wall on {url}")
+        return None
+
+    return ExtractedArticle(url=url, title=title, text=text)
@@ -0,0 +1,210 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+import asyncio
+import xml.etree.ElementTree as ET
+
+import httpx
+
+from utils.http import get_http_client
+
+
+FEED_TYPES = {"application/rss+xml", "application/atom+xml", "application/feed+xml"}
+# Probed relative to the page and to the site root, in order of preference
+COMMON_FEED_PATHS = ["feed", "rss", "feed.xml", "rss.xml", "atom.xml", "index.xml"]
+SITEMAP_PATHS = ["/sitemap.xml", "/sitemap_index.xml", "/news-sitemap.xml"]
+MAX_SITEMAP_DEPTH = 2  # Nested sitemap indexes followed below the first one
+
+EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+class _FeedLinkParser(HTMLParser):
+    """Collects <link rel="alternate"> feed URLs from a page's HTML"""
+
+    def __init__(self):
+        super().__init__()
+        self.feed_urls: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "link":
+            return
+        attributes = dict(attrs)
+        rel = (attributes.get("rel") or "").lower().split()
+        if "alternate" in rel and attributes.get("type") in FEED_TYPES and attributes.get("href"):
+            self.feed_urls.append(attributes["href"])
+
+
+def _local_name(element: ET.Element) -> str:
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element: ET.Element, *names: str) -> str | None:
+    for child in element:
+        if _local_name(child) in names and child.text:
+            return child.text.strip()
+    return None
+
+
+def _parse_date(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            date = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return date if date.tzinfo else date.replace(tzinfo=timezone.utc)
+
+
+def _atom_link(entry: ET.Element) -> str | None:
+    for child in entry:
+        if _local_name(child) == "link" and child.get("rel", "alternate") == "alternate":
+            return child.get("href")
+    return None
+
+
+def parse_feed(xml: bytes) -> tuple[list[tuple[datetime | None, str]], list[tuple[datetime | None, str]]]:
+    """
+    Parse an RSS, Atom or sitemap document.
+
+    Returns:
+        (entries, child_sitemaps), both as (date, url) pairs in document order
+    """
+    root = ET.fromstring(xml)
+    entries, child_sitemaps = [], []
+
+    for element in root.iter():
+        name = _local_name(element)
+        if name == "item":  # RSS
+            link = _child_text(element, "link")
+            date = _parse_date(_child_text(element, "pubDate", "date", "updated"))
+            if link:
+                entries.append((date, link))
+        elif name == "entry":  # Atom
+            link = _atom_link(element)
+            date = _parse_date(_child_text(element, "published", "updated"))
+            if link:
+                entries.append((date, link))
+        elif name == "url":  # Sitemap, news sitemaps keep the date in a nested element
+            link = _child_text(element, "loc")
+            date = _parse_date(_child_text(element, "lastmod"))
+            for child in element:
+                if _local_name(child) == "news":
+                    date = _parse_date(_child_text(child, "publication_date")) or date
+            # Sitemaps list every page, only dated entries can be ordered by recency
+            if link and date:
+                entries.append((date, link))
+        elif name == "sitemap":  # Sitemap index
+            link = _child_text(element, "loc")
+            if link:
+                child_sitemaps.append((_parse_date(_child_text(element, "lastmod")), link))
+
+    return entries, child_sitemaps
+
+
+def latest_entries(
+    entries: list[tuple[datetime | None, str]], num_articles: int, exclude: set[str]
+) -> list[str]:
+    """Newest first, undated entries keep their feed order after the dated ones"""
+    indexed = [(date or EPOCH, -index, url) for index, (date, url) in enumerate(entries)]
+    urls = []
+    for _, _, url in sorted(indexed, reverse=True):
+        if url.rstrip("/") not in exclude and url not in urls:
+            urls.append(url)
+        if len(urls) == num_articles:
+            break
+    return urls
+
+
+async def _fetch(client: httpx.AsyncClient, url: str) -> httpx.Response | None:
+    try:
+        response = await client.get(url)
+    except httpx.HTTPError:
+        return None
+    return response if response.status_code < 400 else None
+
+
+async def _read_feed(
+    client: httpx.AsyncClient, url: str, depth: int = 0, seen: set[str] | None = None
+) -> list[tuple[datetime | None, str]]:
+    seen = seen if seen is not None else set()
+    seen.add(url)
+    response = await _fetch(client, url)
+    if response is None:
+        return []
+    try:
+        entries, child_sitemaps = parse_feed(response.content)
+    except ET.ParseError:
+        return []
+
+    if not entries and child_sitemaps:
+        # Sitemap index, the newest child sitemap holds the latest articles
+        # Indexes pointing at themselves or each other would recurse forever
+        newest = latest_entries(child_sitemaps, 1, seen)
+        if newest and depth < MAX_SITEMAP_DEPTH:
+            return await _read_feed(client, newest[0], depth + 1, seen)
+    return entries
+
+
+def is_same_site(url: str, host: str) -> bool:
+    """Whether a URL is on host or one of its subdomains, ignoring "www." """
+    netloc = (urlparse(url).hostname or "").removeprefix("www.")
+    return netloc == host or netloc.endswith("." + host)
+
+
+async def discover_latest_articles(
+    website: str, num_articles: int, client: httpx.AsyncClient | None = None
+) -> list[str] | None:
+    """
+    Find a website's latest articles from its RSS/Atom feed or sitemap.
+
+    Feeds advertised with <link rel="alternate"> are tried first, then common
+    feed paths, then sitemap.xml. The first source with entries wins.
+    Advertised feeds may link to other sites (e.g. aggregators), guessed
+    paths and sitemaps only count links to the website itself.
+
+    Returns:
+        Up to num_articles URLs, newest first, or None if no feed was found
+    """
+    client = client or get_http_client()
+    root = urljoin(website, "/")
+
+    feed_links = []
+    page = await _fetch(client, website)
+    if page is not None and "html" in page.headers.get("content-type", ""):
+        parser = _FeedLinkParser()
+        parser.feed(page.text)
+        feed_links = [urljoin(str(page.url), href) for href in parser.feed_urls]
+    elif page is not None:
+        # The website URL itself may already be a feed
+        feed_links = [website]
+
+    base = website if website.endswith("/") else website + "/"
+    guesses = [urljoin(prefix, path) for path in COMMON_FEED_PATHS for prefix in (base, root)]
+    guesses.extend(urljoin(root, path) for path in SITEMAP_PATHS)
+
+    exclude = {website.rstrip("/"), root.rstrip("/")}
+    host = (urlparse(website).hostname or "").removeprefix("www.")
+    # Advertised feeds first, only guess paths when the page doesn't list any
+    for candidates, advertised in ((feed_links, True), (guesses, False)):
+        candidates = list(dict.fromkeys(candidates))
+        # Probe every candidate at once, then take the first in order of preference
+        feeds = await asyncio.gather(
+            *[_read_feed(client, url) for url in candidates], return_exceptions=True
+        )
+        for url, entries in zip(candidates, feeds):
+            if isinstance(entries, Exception):
+                print(f"✗ Reading feed {url} failed: {type(entries).__name__}: {str(entries)}")
+                continue
+            if not advertised:
+                # A guessed path may be some other site's feed or sitemap
+                entries = [(date, link) for date, link in entries if is_same_site(link, host)]
+            urls = latest_entries(entries, num_articles, exclude)
+            if urls:
+                print(f"✓ Found {len(urls)} articles in feed {url}")
+                return urls
+
+    return None
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import ffmpeg
+
+from utils.rate_limit import limiters
+
+
+FFMPEG_TIMEOUT = 300  # Max seconds for a single ffmpeg command
+FFPROBE_TIMEOUT = 30  # Max seconds for a single ffprobe command
+
+
+class FFmpegError(Exception):
+    def __init__(self, message: str, stderr: str = ""):
+        super().__init__(message)
+        self.stderr = stderr
+
+
+async def _run(args: list[str], timeout: float) -> tuple[bytes, bytes]:
+    """
+    Run a command as an asyncio subprocess within the ffmpeg pool.
+
+    The pool is the "ffmpeg" limiter, sized to the number of CPU cores.
+    If the caller is cancelled or the timeout expires, the process is killed.
+    """
+    async with limiters["ffmpeg"].limit():
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            async with asyncio.timeout(timeout):
+                stdout, stderr = await process.communicate()
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+
+    if process.returncode != 0:
+        stderr_text = stderr.decode("utf-8", errors="replace")
+        raise FFmpegError(
+            f"{args[0]} exited with code {process.returncode}: {stderr_text[-500:]}",
+            stderr_text,
+        )
+    return stdout, stderr
+
+
+async def run_ffmpeg(stream, timeout: float = FFMPEG_TIMEOUT) -> str:
+    """
+    Run an ffmpeg-python stream without blocking the event loop.
+
+    Args:
+        stream: Output stream built with ffmpeg-python
+        timeout: Max seconds before the process is killed
+
+    Returns:
+        Captured stderr of the ffmpeg process
+
+    Raises:
+        FFmpegError: If ffmpeg exits with a non-zero code
+        TimeoutError: If the timeout expires
+    """
+    args = ffmpeg.compile(stream, overwrite_output=True)
+    _, stderr = await _run(args, timeout)
+    return stderr.decode("utf-8", errors="replace")
+
+
+async def probe(path: str, timeout: float = FFPROBE_TIMEOUT) -> dict:
+    """
+    Async equivalent of ffmpeg.probe.
+
+    Returns:
+        Parsed ffprobe JSON output with "format" and "streams"
+    """
+    stdout, _ = await _run(
+        ["ffprobe", "-show_format", "-show_streams", "-of", "json", path], timeout
+    )
+    return json.loads(stdout)
@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable
+from pydantic import BaseModel, Field, PrivateAttr
+import asyncio
+import uuid
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class SceneProgress(BaseModel):
+    status: str = "pending"
+    error: str | None = None
+
+
+class ArticleProgress(BaseModel):
+    status: str = "pending"
+    scenes: dict[int, SceneProgress] = Field(default_factory=dict)
+    error: str | None = None
+
+
+class Job(BaseModel):
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    kind: str
+    status: JobStatus = JobStatus.QUEUED
+    stage: str | None = None
+    articles: dict[str, ArticleProgress] = Field(default_factory=dict)
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    result: Any = None
+    error: str | None = None
+
+    _events: list[dict] = PrivateAttr(default_factory=list)
+    _changed: asyncio.Event = PrivateAttr(default_factory=asyncio.Event)
+
+    def emit(self, event: str, **data):
+        """Record a progress event and wake up every stream_events() subscriber"""
+        self._events.append({"event": event, "data": data})
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def stream_events(self, heartbeat: float | None = None) -> AsyncIterator[dict | None]:
+        """
+        Yield every event from the start of the job until it finishes.
+
+        Late subscribers get the events they missed first. If heartbeat is set,
+        None is yielded after that many idle seconds so callers can keep the
+        connection alive.
+        """
+        index = 0
+        while True:
+            while index < len(self._events):
+                yield self._events[index]
+                index += 1
+            if self.is_finished():
+                return
+
+            try:
+                async with asyncio.timeout(heartbeat):
+                    await self._changed.wait()
+            except TimeoutError:
+                yield None
+
+    def set_stage(self, stage: str):
+        self.stage = stage
+
+    def update_article(self, article_url: str, status: str, error: str | None = None):
+        article = self.articles.setdefault(article_url, ArticleProgress())
+        article.status = status
+        article.error = error
+
+    def update_scene(
+        self, article_url: str, scene_index: int, status: str, error: str | None = None
+    ):
+        article = self.articles.setdefault(article_url, ArticleProgress())
+        scene = article.scenes.setdefault(scene_index, SceneProgress())
+        scene.status = status
+        scene.error = error
+
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+JobFunc = Callable[[Job], Awaitable[Any]]
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobManager:
+    """
+    Bounded in-process job executor.
+
+    Jobs are queued and picked up by a fixed number of worker tasks, so
+    callers get a job id back immediately and poll for progress instead of
+    holding the HTTP connection open for the whole pipeline.
+
+    Args:
+        max_workers: Number of jobs allowed to run at the same time
+        max_queued: Maximum number of jobs waiting to run
+        max_finished: Number of finished jobs kept around for polling
+    """
+
+    def __init__(self, max_workers: int = 2, max_queued: int = 100, max_finished: int = 200):
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self._queue: asyncio.Queue[tuple[Job, JobFunc]] = asyncio.Queue(maxsize=max_queued)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._workers: list[asyncio.Task] = []
+
+    def start(self):
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.max_workers)
+        ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, kind: str, func: JobFunc) -> Job:
+        """
+        Queue a job for background execution.
+
+        Args:
+            kind: Name of the job type (e.g. "latest", "sora")
+            func: Coroutine function taking the job, used to report progress
+
+        Returns:
+            The queued Job
+
+        Raises:
+            JobQueueFull: If the queue has no room left
+        """
+        job = Job(kind=kind)
+        try:
+            self._queue.put_nowait((job, func))
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Job queue is full ({self._queue.maxsize} jobs)")
+
+        self._jobs[job.id] = job
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished()]
+        for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    async def _worker(self, worker_index: int):
+        while True:
+            job, func = await self._queue.get()
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.now()
+            print(f"Worker {worker_index} running {job.kind} job {job.id}")
+            try:
+                job.result = await func(job)
+                job.status = JobStatus.SUCCEEDED
+                print(f"✓ Job {job.id} finished")
+            except asyncio.CancelledError:
+                job.error = "Cancelled"
+                job.status = JobStatus.FAILED
+                raise
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {str(e)}"
+                job.status = JobStatus.FAILED
+                print(f"✗ Job {job.id} failed: {job.error}")
+            finally:
+                job.finished_at = datetime.now()
+                job.emit("job_finished", status=job.status.value, error=job.error)
+                self._queue.task_done()
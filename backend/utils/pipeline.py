@@ -0,0 +1,51 @@
+from typing import Any, Awaitable, Callable
+import asyncio
+
+
+StageFunc = Callable[..., Awaitable[Any]]
+
+
+async def run_stage_graph(stages: dict[str, tuple[list[str], StageFunc]]) -> dict[str, Any]:
+    """
+    Run a small dependency graph of async stages.
+
+    Every stage starts as soon as the stages it depends on have finished, so
+    independent branches run in parallel. Each stage function receives the
+    results of its dependencies as keyword arguments named after them.
+
+    Args:
+        stages: Mapping of stage name to (dependency names, stage function).
+            Dependencies must be declared before the stages that use them.
+
+    Returns:
+        Mapping of stage name to its result
+
+    Raises:
+        The first exception raised by any stage; all other stages are cancelled
+    """
+    seen = set()
+    for name, (deps, _) in stages.items():
+        for dep in deps:
+            if dep not in seen:
+                raise ValueError(f"Stage '{name}' depends on undeclared stage '{dep}'")
+        seen.add(name)
+
+    tasks: dict[str, asyncio.Task] = {}
+
+    async def _run(name: str):
+        deps, func = stages[name]
+        kwargs = {dep: await tasks[dep] for dep in deps}
+        return await func(**kwargs)
+
+    for name in stages:
+        tasks[name] = asyncio.create_task(_run(name))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+
+    return {name: task.result() for name, task in tasks.items()}
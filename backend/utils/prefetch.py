@@ -0,0 +1,295 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import time
+
+from utils.http import canonical_url
+from utils.summary_store import STORE_PATH
+
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_MAX_PARALLEL = int(os.getenv("PREFETCH_MAX_PARALLEL", 1))  # Sources refreshed at the same time
+PREFETCH_JITTER = float(os.getenv("PREFETCH_JITTER", 0.1))  # Fraction of the interval runs are shifted by
+PREFETCH_TICK_SECONDS = 60  # Longest sleep between checks for due sources
+
+# Same frequencies as the content sources in frontend/types/sources.ts
+SCRAPE_INTERVALS = {
+    "realtime": int(os.getenv("PREFETCH_REALTIME_SECONDS", 15 * 60)),
+    "hourly": 60 * 60,
+    "daily": 24 * 60 * 60,
+    "weekly": 7 * 24 * 60 * 60,
+}
+# Source types the feed discovery and browser agent know how to read
+PREFETCH_SOURCE_TYPES = {"url", "rss_feed"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prefetch_sources (
+    url TEXT PRIMARY KEY,
+    source_url TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    interval_seconds REAL NOT NULL,
+    is_active INTEGER NOT NULL,
+    next_run_at REAL NOT NULL,
+    last_run_at REAL,
+    last_error TEXT,
+    result TEXT,
+    result_at REAL
+)
+"""
+
+
+@dataclass
+class PrefetchSource:
+    url: str
+    """Canonical URL, the key the source is looked up by"""
+    source_url: str
+    source_type: str
+    interval_seconds: float
+    is_active: bool
+    next_run_at: float
+    last_run_at: float | None = None
+    last_error: str | None = None
+    result_at: float | None = None
+
+
+RefreshFunc = Callable[[str], Awaitable[dict]]
+
+
+class PrefetchScheduler:
+    """
+    Refreshes registered sources in the background, ahead of the users asking for them.
+
+    Each source is refreshed every interval_seconds, shifted by a random
+    fraction (jitter) of the interval so sources registered together drift
+    apart instead of all refreshing at once. At most max_parallel refreshes
+    run at the same time. The result of the last successful refresh is kept
+    in SQLite, so it survives restarts and can be served while it is fresh.
+
+    Args:
+        refresh: Coroutine function taking the source URL and returning its result,
+            raising if the refresh failed
+        path: SQLite database the sources are stored in
+        max_parallel: Number of sources refreshed at the same time
+        jitter: Fraction of the interval every run is shifted by, at random
+    """
+
+    def __init__(
+        self,
+        refresh: RefreshFunc,
+        path: str | Path = STORE_PATH,
+        max_parallel: int = PREFETCH_MAX_PARALLEL,
+        jitter: float = PREFETCH_JITTER,
+    ):
+        self.refresh = refresh
+        self.jitter = jitter
+        self.refreshes = 0
+        self.failures = 0
+        self.served = 0
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(SCHEMA)
+        self._db.commit()
+        self._semaphore = asyncio.Semaphore(max_parallel)
+        self._running: dict[str, asyncio.Task] = {}
+        self._wake = asyncio.Event()
+        self._loop_task: asyncio.Task | None = None
+
+    def _source(self, row: sqlite3.Row) -> PrefetchSource:
+        return PrefetchSource(
+            url=row["url"],
+            source_url=row["source_url"],
+            source_type=row["source_type"],
+            interval_seconds=row["interval_seconds"],
+            is_active=bool(row["is_active"]),
+            next_run_at=row["next_run_at"],
+            last_run_at=row["last_run_at"],
+            last_error=row["last_error"],
+            result_at=row["result_at"],
+        )
+
+    def _next_run(self, interval_seconds: float) -> float:
+        return time.time() + interval_seconds * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def register(
+        self,
+        source_url: str,
+        source_type: str = "url",
+        scrape_frequency: str = "daily",
+        interval_seconds: float | None = None,
+        is_active: bool = True,
+    ) -> PrefetchSource:
+        """
+        Add a source, or update it if it is already registered.
+
+        New sources are due right away, updated ones keep their last result.
+        An update to a shorter interval brings the next run forward to within
+        the new interval. interval_seconds overrides the interval of
+        scrape_frequency.
+
+        Raises:
+            ValueError: If the source type or frequency isn't supported
+        """
+        if source_type not in PREFETCH_SOURCE_TYPES:
+            raise ValueError(f"Source type {source_type} can't be prefetched")
+        if interval_seconds is None:
+            if scrape_frequency not in SCRAPE_INTERVALS:
+                raise ValueError(f"Unknown scrape frequency {scrape_frequency}")
+            interval_seconds = SCRAPE_INTERVALS[scrape_frequency]
+
+        url = canonical_url(source_url)
+        now = time.time()
+        with self._db:
+            self._db.execute(
+                """
+                INSERT INTO prefetch_sources
+                    (url, source_url, source_type, interval_seconds, is_active, next_run_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    source_url = excluded.source_url,
+                    source_type = excluded.source_type,
+                    interval_seconds = excluded.interval_seconds,
+                    is_active = excluded.is_active,
+                    next_run_at = MIN(next_run_at, ?)
+                """,
+                (url, source_url, source_type, interval_seconds, int(is_active), now, now + interval_seconds),
+            )
+        self._wake.set()
+        return self.get(url)
+
+    def unregister(self, source_url: str) -> bool:
+        url = canonical_url(source_url)
+        with self._db:
+            deleted = self._db.execute("DELETE FROM prefetch_sources WHERE url = ?", (url,)).rowcount
+        task = self._running.pop(url, None)
+        if task:
+            task.cancel()
+        return deleted > 0
+
+    def get(self, source_url: str) -> PrefetchSource | None:
+        row = self._db.execute(
+            "SELECT * FROM prefetch_sources WHERE url = ?", (canonical_url(source_url),)
+        ).fetchone()
+        return self._source(row) if row else None
+
+    def sources(self) -> list[PrefetchSource]:
+        rows = self._db.execute("SELECT * FROM prefetch_sources ORDER BY next_run_at").fetchall()
+        return [self._source(row) for row in rows]
+
+    def fresh_result(self, source_url: str) -> dict | None:
+        """Last refresh result of an active source, if it is younger than the source's interval"""
+        row = self._db.execute(
+            """
+            SELECT interval_seconds, result, result_at FROM prefetch_sources
+            WHERE url = ? AND is_active = 1
+            """,
+            (canonical_url(source_url),),
+        ).fetchone()
+        if row is None or row["result"] is None:
+            return None
+        # Allow for the jitter, a result shouldn't expire just before its refresh lands
+        max_age = row["interval_seconds"] * (1 + self.jitter)
+        if time.time() - row["result_at"] > max_age:
+            return None
+        self.served += 1
+        return json.loads(row["result"])
+
+    def record_result(self, source_url: str, result: dict):
+        """Store a result computed outside the scheduler, if the source is registered"""
+        with self._db:
+            self._db.execute(
+                "UPDATE prefetch_sources SET result = ?, result_at = ? WHERE url = ?",
+                (json.dumps(result), time.time(), canonical_url(source_url)),
+            )
+
+    def start(self):
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        tasks = list(self._running.values())
+        if self._loop_task:
+            tasks.append(self._loop_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._running.clear()
+        self._loop_task = None
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            now = time.time()
+            rows = self._db.execute(
+                "SELECT * FROM prefetch_sources WHERE is_active = 1 ORDER BY next_run_at"
+            ).fetchall()
+            sleep = PREFETCH_TICK_SECONDS
+            for source in map(self._source, rows):
+                if source.url in self._running:
+                    continue
+                if source.next_run_at > now:
+                    sleep = min(sleep, source.next_run_at - now)
+                    break
+                # Started right away, the semaphore holds them back beyond max_parallel
+                self._running[source.url] = asyncio.create_task(self._refresh(source))
+
+            try:
+                async with asyncio.timeout(sleep):
+                    await self._wake.wait()
+            except TimeoutError:
+                pass
+
+    async def _refresh(self, source: PrefetchSource):
+        result, error = None, None
+        try:
+            async with self._semaphore:
+                print(f"Prefetching {source.source_url}")
+                started = time.perf_counter()
+                result = await self.refresh(source.source_url)
+                print(f"✓ Prefetched {source.source_url} in {time.perf_counter() - started:.2f}s")
+                self.refreshes += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            self.failures += 1
+            print(f"✗ Prefetching {source.source_url} failed: {error}")
+        finally:
+            self._running.pop(source.url, None)
+
+        now = time.time()
+        payload = json.dumps(result) if result is not None else None
+        with self._db:
+            # A failed refresh keeps the previous result, it is still the latest we have
+            self._db.execute(
+                """
+                UPDATE prefetch_sources SET
+                    next_run_at = ?,
+                    last_run_at = ?,
+                    last_error = ?,
+                    result = COALESCE(?, result),
+                    result_at = CASE WHEN ? IS NULL THEN result_at ELSE ? END
+                WHERE url = ?
+                """,
+                (self._next_run(source.interval_seconds), now, error, payload, payload, now, source.url),
+            )
+        self._wake.set()
+
+    def stats(self) -> dict:
+        active = self._db.execute(
+            "SELECT COUNT(*) FROM prefetch_sources WHERE is_active = 1"
+        ).fetchone()[0]
+        return {
+            "active_sources": active,
+            "running": len(self._running),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "served": self.served,
+        }
@@ -0,0 +1,147 @@
+from contextlib import asynccontextmanager
+import asyncio
+import os
+import time
+
+
+# Default limits per provider. Override with <PROVIDER>_MAX_CONCURRENCY and
+# <PROVIDER>_RATE_PER_SECOND environment variables, e.g. SORA_MAX_CONCURRENCY=2
+PROVIDER_LIMITS = {
+    "openai": {"max_concurrency": 20, "rate_per_second": 5.0},
+    "sora": {"max_concurrency": 4, "rate_per_second": 0.5},
+    "elevenlabs": {"max_concurrency": 5, "rate_per_second": 2.0},
+    "anthropic": {"max_concurrency": 10, "rate_per_second": 2.0},
+    "browser_use": {"max_concurrency": 3, "rate_per_second": 1.0},
+    "ffmpeg": {"max_concurrency": os.cpu_count() or 1, "rate_per_second": None},
+}
+
+THROTTLE_STATUS_CODES = {429, 500, 502, 503, 504, 529}
+
+
+def get_status_code(error: BaseException) -> int | None:
+    """Best-effort HTTP status code of an error raised by any provider SDK"""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    return get_status_code(error) in THROTTLE_STATUS_CODES
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit plus a token bucket that adapts to provider throttling.
+
+    The refill rate is halved whenever a call fails with 429/5xx and recovers
+    additively towards the configured rate after each successful call, so
+    the provider is kept close to its quota without repeatedly tripping it.
+
+    Args:
+        name: Provider name, used in logs
+        max_concurrency: Maximum number of calls in flight
+        rate_per_second: Maximum sustained call rate, None for no rate limit
+        burst: Bucket capacity (default: max(1, rate_per_second))
+        min_rate_per_second: Floor for the rate after backing off
+        backoff_factor: Multiplier applied to the rate on throttling
+        recovery_step: Fraction of the configured rate regained per success
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        rate_per_second: float | None = None,
+        burst: float | None = None,
+        min_rate_per_second: float | None = None,
+        backoff_factor: float = 0.5,
+        recovery_step: float = 0.1,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_rate = rate_per_second
+        self.rate = rate_per_second
+        self.min_rate = min_rate_per_second or (rate_per_second / 10 if rate_per_second else None)
+        self.capacity = burst or max(1.0, rate_per_second or 1.0)
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+
+        self.tokens = self.capacity
+        self.throttled_count = 0
+        self._updated_at = time.monotonic()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def _take_token(self):
+        if self.rate is None:
+            return
+        # Waiters queue on the lock, so tokens are handed out in FIFO order
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def on_throttled(self):
+        self.throttled_count += 1
+        if self.rate is None:
+            return
+        self._refill()
+        self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+        self.tokens = min(self.tokens, 0)
+        print(f"✗ {self.name} throttled, backing off to {self.rate:.2f} calls/s")
+
+    def on_success(self):
+        if self.rate is None or self.rate >= self.max_rate:
+            return
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + self.max_rate * self.recovery_step)
+
+    @asynccontextmanager
+    async def limit(self):
+        async with self._semaphore:
+            await self._take_token()
+            try:
+                yield
+            except Exception as e:
+                if is_throttle_error(e):
+                    self.on_throttled()
+                raise
+            else:
+                self.on_success()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "rate_per_second": self.rate,
+            "max_rate_per_second": self.max_rate,
+            "throttled_count": self.throttled_count,
+        }
+
+
+def _env_number(name: str, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return type(default)(value) if default is not None else float(value)
+
+
+def _build_limiter(provider: str, config: dict) -> AdaptiveLimiter:
+    prefix = provider.upper()
+    return AdaptiveLimiter(
+        provider,
+        max_concurrency=_env_number(f"{prefix}_MAX_CONCURRENCY", config["max_concurrency"]),
+        rate_per_second=_env_number(f"{prefix}_RATE_PER_SECOND", config["rate_per_second"]),
+    )
+
+
+limiters: dict[str, AdaptiveLimiter] = {
+    provider: _build_limiter(provider, config) for provider, config in PROVIDER_LIMITS.items()
+}
@@ -1,14 +1,44 @@
+from contextlib import asynccontextmanager
 from openai.types import Video
 from pydantic import BaseModel
 from openai import AsyncOpenAI
 from ruamel.yaml import YAML
 import os
 import asyncio
-import tempfile
+
+from utils.cache import CACHE_ROOT, DiskCache, cache_key
+from utils.download import DOWNLOAD_BUFFER_SIZE, download_to_file
+from utils.rate_limit import limiters
+from utils.singleflight import SingleFlight
+from utils.workspace import workspace
 
 
 client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+SORA_PROMPT_MODEL = "gpt-4o"
+SORA_MODEL = "sora-2"
+SORA_SECONDS = "4"
+SORA_SIZE = "720x1280"
+
+ARTIFACT_CACHE_TTL = 7 * 24 * 60 * 60  # Re-render anything older than a week
+SORA_PROMPT_CACHE_MAX_BYTES = 50 * 1024 * 1024  # 50MB of prompts
+SORA_CLIP_CACHE_MAX_BYTES = 5 * 1024 * 1024 * 1024  # 5GB of rendered clips
+
+sora_prompt_cache = DiskCache(
+    CACHE_ROOT / "sora_prompts",
+    max_bytes=SORA_PROMPT_CACHE_MAX_BYTES,
+    ttl_seconds=ARTIFACT_CACHE_TTL,
+    suffix=".txt",
+)
+sora_clip_cache = DiskCache(
+    CACHE_ROOT / "sora_clips",
+    max_bytes=SORA_CLIP_CACHE_MAX_BYTES,
+    ttl_seconds=ARTIFACT_CACHE_TTL,
+    suffix=".mp4",
+)
+# The clip cache already serves finished clips, only coalesce renders in flight
+sora_clip_flight = SingleFlight("sora_clips", memo_seconds=0)
+
 yaml = YAML()
 with open("prompts.yaml", "r") as f:
     prompts = yaml.load(f)
@@ -27,26 +57,37 @@ class ScenesResponse(BaseModel):
 async def convert_to_scenes(article_content: str) -> ScenesResponse | None:
     print("Converting article to scenes...")
     system_prompt = prompts.get("scene_converter_prompt", "")
-    response = await client.responses.parse(
-        model="gpt-5",
-        input=article_content,
-        instructions=system_prompt,
-        text_format=ScenesResponse,
-        reasoning={"effort": "medium"},
-    )
+    async with limiters["openai"].limit():
+        response = await client.responses.parse(
+            model="gpt-5",
+            input=article_content,
+            instructions=system_prompt,
+            text_format=ScenesResponse,
+            reasoning={"effort": "medium"},
+        )
     return response.output_parsed
 
 
 async def scene_to_sora_prompt(scene: Scene) -> str:
-    print("Converting scene to Sora prompt...")
     sora_system = prompts.get("sora_prompt_converter", "")
     user_prompt = scene.visual + "\n\n" + scene.reasoning
 
-    response = await client.responses.create(
-        model="gpt-4o",
-        input=user_prompt,
-        instructions=sora_system,
-    )
+    # Keyed on everything that shapes the prompt, so editing prompts.yaml invalidates it
+    key = cache_key(user_prompt, sora_system, SORA_PROMPT_MODEL)
+    cached_prompt = sora_prompt_cache.get_text(key)
+    if cached_prompt is not None:
+        print("✓ Sora prompt cache hit")
+        return cached_prompt
+
+    print("Converting scene to Sora prompt...")
+    async with limiters["openai"].limit():
+        response = await client.responses.create(
+            model=SORA_PROMPT_MODEL,
+            input=user_prompt,
+            instructions=sora_system,
+        )
+
+    sora_prompt_cache.put_text(key, response.output_text)
     return response.output_text
 
 
@@ -65,13 +106,14 @@ async def create_sora_video(sora_prompt: str, max_retries: int = 1) -> Video | N
         try:
             print(f"Creating Sora video... (Attempt {attempt + 1}/{max_retries})")
 
-            video = await client.videos.create_and_poll(
-                prompt=sora_prompt,
-                model="sora-2",
-                timeout=120,
-                seconds="4",
-                size="720x1280",
-            )
+            async with limiters["sora"].limit():
+                video = await client.videos.create_and_poll(
+                    prompt=sora_prompt,
+                    model=SORA_MODEL,
+                    timeout=120,
+                    seconds=SORA_SECONDS,
+                    size=SORA_SIZE,
+                )
 
             print(f"✓ Sora video created successfully on attempt {attempt + 1}")
             return video
@@ -92,29 +134,69 @@ async def create_sora_video(sora_prompt: str, max_retries: int = 1) -> Video | N
     return None
 
 
-async def download_sora_video(video: Video) -> str:
+async def download_sora_video(
+    video: Video,
+    destination: str | None = None,
+    buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+) -> str:
     """
-    Download Sora video content and save to a temporary file.
+    Download Sora video content to a file without blocking the event loop.
+
+    The clip is streamed in chunks and resumed with a range request if the
+    transfer is interrupted.
 
     Args:
         video: Video object from Sora API
+        destination: Path to write the video to. If None, uses a workspace temp file
+        buffer_size: Chunk size for reads and writes
 
     Returns:
-        Path to the temporary file containing the video
+        Path to the file containing the video
     """
     print(f"Downloading Sora video {video.id}...")
-    response = await client.videos.download_content(video.id, variant="video")
-
-    # Create a temporary file with .mp4 extension
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4", mode="wb")
-
-    try:
-        # HTTPXBinaryResponse needs to be iterated or read
-        for chunk in response.iter_bytes():
-            temp_file.write(chunk)
-        temp_file.flush()
-        temp_path = temp_file.name
-        print(f"✓ Video downloaded to: {temp_path}")
-        return temp_path
-    finally:
-        temp_file.close()
+
+    if destination is None:
+        destination = workspace.temp_path(".mp4")
+
+    @asynccontextmanager
+    async def open_stream(offset: int):
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        async with limiters["openai"].limit():
+            async with client.videos.with_streaming_response.download_content(
+                video.id, variant="video", extra_headers=headers
+            ) as response:
+                yield response
+
+    await download_to_file(open_stream, destination, buffer_size=buffer_size)
+    print(f"✓ Video downloaded to: {destination}")
+    return destination
+
+
+async def get_or_render_sora_clip(sora_prompt: str) -> tuple[str, Video | None]:
+    """
+    Return a rendered clip for the prompt, rendering it only if it isn't cached.
+
+    Args:
+        sora_prompt: The prompt for Sora video generation
+
+    Returns:
+        Tuple of (path to the clip, Video object or None if served from the cache)
+    """
+    key = cache_key(sora_prompt, SORA_MODEL, SORA_SECONDS, SORA_SIZE)
+    cached_path = sora_clip_cache.get_path(key)
+    if cached_path is not None:
+        print(f"✓ Sora clip cache hit: {cached_path}")
+        return str(cached_path), None
+
+    # Identical scenes rendering at the same time share one Sora job
+    return await sora_clip_flight.do(key, lambda: _render_sora_clip(key, sora_prompt))
+
+
+async def _render_sora_clip(key: str, sora_prompt: str) -> tuple[str, Video]:
+    video = await create_sora_video(sora_prompt)
+    if video is None:
+        raise Exception("Sora video creation failed")
+
+    video_path = await download_sora_video(video)
+    clip_path = sora_clip_cache.put_file(key, video_path, move=True)
+    return str(clip_path), video
@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+import asyncio
+import os
+import time
+
+
+# How long a finished result is still handed to identical requests
+COALESCE_MEMO_SECONDS = float(os.getenv("COALESCE_MEMO_SECONDS", 30))
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one computation.
+
+    The first caller for a key starts the work and every caller that arrives
+    while it runs awaits the same result. Successful results are memoized for
+    memo_seconds afterwards; exceptions, and results the succeeded check
+    rejects, are not. The work runs in its own task, so a caller giving up
+    doesn't cancel it for the others.
+
+    Args:
+        name: Name used in logs and stats
+        memo_seconds: How long finished results are reused, 0 to disable
+        max_memo_entries: Number of memoized results kept, oldest dropped first
+        succeeded: Whether a returned result counts as a success and may be
+            memoized, by default anything but None
+    """
+
+    def __init__(
+        self,
+        name: str,
+        memo_seconds: float = COALESCE_MEMO_SECONDS,
+        max_memo_entries: int = 1000,
+        succeeded: Callable[[Any], bool] = lambda result: result is not None,
+    ):
+        self.name = name
+        self.memo_seconds = memo_seconds
+        self.max_memo_entries = max_memo_entries
+        self.succeeded = succeeded
+        self.calls = 0
+        self.coalesced = 0
+        self.memo_hits = 0
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._memo: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    def _memoized(self, key: str) -> tuple[Any] | None:
+        entry = self._memo.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._memo[key]
+            return None
+        return (result,)
+
+    def is_in_flight(self, key: str) -> bool:
+        return key in self._in_flight
+
+    def claim(self, key: str, use_memo: bool = True) -> tuple[asyncio.Future, bool]:
+        """
+        Join the computation for a key, or become the caller that runs it.
+
+        With use_memo=False a memoized result is ignored, so the work runs
+        again unless it is already in flight.
+
+        Returns:
+            A future for the result, and True if the caller must compute it
+            and call resolve() or fail() when done
+        """
+        self.calls += 1
+        future = asyncio.get_running_loop().create_future()
+
+        memoized = self._memoized(key) if use_memo else None
+        if memoized is not None:
+            self.memo_hits += 1
+            future.set_result(memoized[0])
+            return future, False
+
+        if key in self._in_flight:
+            self.coalesced += 1
+            print(f"✓ {self.name}: joined in-flight request {key[:16]}")
+            return self._in_flight[key], False
+
+        # Nobody may await the future, don't let an error on it be logged as unretrieved
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = future
+        return future, True
+
+    def resolve(self, key: str, result: Any, memoize: bool = True):
+        future = self._in_flight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(result)
+        if memoize and self.memo_seconds > 0 and self.succeeded(result):
+            self._memo[key] = (time.monotonic() + self.memo_seconds, result)
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_memo_entries:
+                self._memo.popitem(last=False)
+
+    def fail(self, key: str, error: BaseException | None = None):
+        """Fail every waiter with the error, or cancel them if there is none"""
+        future = self._in_flight.pop(key, None)
+        if future is None or future.done():
+            return
+        if error is None:
+            future.cancel()
+        else:
+            future.set_exception(error)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]], use_memo: bool = True) -> Any:
+        """Run func once for every concurrent caller with this key and share its result"""
+        future, leader = self.claim(key, use_memo)
+        if leader:
+            task = asyncio.create_task(func())
+            self._tasks.add(task)
+
+            def _finish(task: asyncio.Task):
+                self._tasks.discard(task)
+                if task.cancelled():
+                    self.fail(key)
+                elif task.exception() is not None:
+                    self.fail(key, task.exception())
+                else:
+                    self.resolve(key, task.result())
+
+            task.add_done_callback(_finish)
+
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "memo_hits": self.memo_hits,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,180 @@
+from dataclasses import dataclass
+from pathlib import Path
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+
+import httpx
+
+from utils.cache import CACHE_ROOT
+from utils.extract import ExtractedArticle, article_from_response
+from utils.http import canonical_url, get_http_client
+
+
+SOURCE_INDEX_PATH = Path(os.getenv("REELY_SOURCE_INDEX", CACHE_ROOT / "sources.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_articles (
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    summary TEXT,
+    first_seen_at REAL NOT NULL,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (source, url)
+)
+"""
+
+
+@dataclass
+class ArticleState:
+    url: str
+    canonical_url: str
+    etag: str | None = None
+    last_modified: str | None = None
+    content_hash: str | None = None
+    summary: str | None = None
+    """Stored summary, only set when the article is unchanged since it was summarized"""
+    fetched: bool = False
+    """Whether the page was downloaded while checking, so the summarizer can skip fetching it"""
+    article: ExtractedArticle | None = None
+    """Main text of the downloaded page, None if it needs a real browser"""
+
+
+def content_hash(article: ExtractedArticle) -> str:
+    """Hash of the page's main text, so ads and timestamps around it don't count as changes"""
+    return hashlib.sha256(article.text.encode("utf-8")).hexdigest()
+
+
+def is_unchanged(row: sqlite3.Row, state: ArticleState) -> bool:
+    if state.content_hash and row["content_hash"]:
+        return state.content_hash == row["content_hash"]
+    # Without main text the raw HTML is no signal, it often embeds per-request nonces.
+    # Fall back to the validators of servers that ignore conditional requests.
+    if state.etag and state.etag == row["etag"]:
+        return True
+    return bool(state.last_modified and state.last_modified == row["last_modified"])
+
+
+class SourceIndex:
+    """
+    Per-source index of the articles already summarized, stored in SQLite.
+
+    Articles are keyed on the source and their canonical URL. An article
+    counts as unchanged when a conditional request (If-None-Match /
+    If-Modified-Since) returns 304, or when its main text hashes the same as
+    last time, in which case its stored summary can be reused. Pages without
+    extractable text only compare their ETag / Last-Modified.
+
+    Changed and new pages are only downloaded once: the response is
+    extracted here and handed to the summarizer on the state.
+    """
+
+    def __init__(self, path: str | Path = SOURCE_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(SCHEMA)
+        self._db.commit()
+
+    def _row(self, source: str, url: str) -> sqlite3.Row | None:
+        return self._db.execute(
+            "SELECT * FROM seen_articles WHERE source = ? AND url = ?", (source, url)
+        ).fetchone()
+
+    async def _check_article(self, client: httpx.AsyncClient, source: str, url: str) -> ArticleState:
+        state = ArticleState(url=url, canonical_url=canonical_url(url))
+        row = self._row(source, state.canonical_url)
+
+        headers = {}
+        if row and row["summary"]:
+            if row["etag"]:
+                headers["If-None-Match"] = row["etag"]
+            if row["last_modified"]:
+                headers["If-Modified-Since"] = row["last_modified"]
+
+        # Unconditional for new articles, the summarizer then reuses this download
+        try:
+            response = await client.get(url, headers=headers)
+        except httpx.HTTPError:
+            response = None
+
+        if response is None or response.status_code >= 400 or response.status_code == 304:
+            # 304 means unchanged. On errors we can't tell, so reuse what's stored too
+            if row:
+                state.etag, state.last_modified = row["etag"], row["last_modified"]
+                state.content_hash = row["content_hash"]
+                state.summary = row["summary"]
+            return state
+
+        state.etag = response.headers.get("etag")
+        state.last_modified = response.headers.get("last-modified")
+        state.fetched = True
+        state.article = await asyncio.to_thread(article_from_response, url, response)
+        if state.article:
+            state.content_hash = content_hash(state.article)
+        if row and row["summary"] and is_unchanged(row, state):
+            state.summary = row["summary"]
+        return state
+
+    async def check(self, source: str, urls: list[str]) -> list[ArticleState]:
+        """
+        Look up every article of a source and revalidate the ones already summarized.
+
+        Returns:
+            One state per URL, with summary set for articles that can be reused
+        """
+        source = canonical_url(source)
+        client = get_http_client()
+        return await asyncio.gather(*[self._check_article(client, source, url) for url in urls])
+
+    def record(self, source: str, states: list[ArticleState], summaries: dict[str, str]):
+        """
+        Store the validators and summaries of the articles that were just checked.
+
+        Articles without a summary are still recorded as seen, but will be
+        summarized again next time.
+        """
+        source = canonical_url(source)
+        now = time.time()
+        with self._db:
+            for state in states:
+                summary = summaries.get(state.url) or state.summary
+                self._db.execute(
+                    """
+                    INSERT INTO seen_articles
+                        (source, url, etag, last_modified, content_hash, summary, first_seen_at, checked_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (source, url) DO UPDATE SET
+                        etag = excluded.etag,
+                        last_modified = excluded.last_modified,
+                        content_hash = excluded.content_hash,
+                        summary = excluded.summary,
+                        checked_at = excluded.checked_at
+                    """,
+                    (
+                        source,
+                        state.canonical_url,
+                        state.etag,
+                        state.last_modified,
+                        state.content_hash,
+                        summary,
+                        now,
+                        now,
+                    ),
+                )
+
+    def stats(self) -> dict:
+        row = self._db.execute(
+            "SELECT COUNT(DISTINCT source) AS sources, COUNT(*) AS articles FROM seen_articles"
+        ).fetchone()
+        return {"sources": row["sources"], "articles": row["articles"]}
+
+
+source_index = SourceIndex()
@@ -0,0 +1,269 @@
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from utils.http import canonical_url
+
+
+STORE_PATH = Path(
+    os.getenv("REELY_STORE_PATH", Path(__file__).resolve().parent.parent / "data" / "reely.db")
+)
+SUMMARIES_DIR = Path(__file__).resolve().parent.parent.parent / "summaries"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    article_url TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS summaries_by_source ON summaries (source, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS summaries_by_article ON summaries (article_url, created_at DESC);
+CREATE INDEX IF NOT EXISTS summaries_by_time ON summaries (created_at DESC);
+
+CREATE TABLE IF NOT EXISTS reels (
+    article_url TEXT PRIMARY KEY,
+    reel_id TEXT NOT NULL,
+    final_video_path TEXT NOT NULL,
+    reel_url TEXT NOT NULL,
+    hls_url TEXT NOT NULL,
+    scenes TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reels_by_time ON reels (created_at DESC);
+"""
+
+# Written by the old JSON dumps as {source with "/" -> "-"}_{%Y-%m-%d_%H:%M:%S}.json,
+# with ":" sometimes replaced by "_" by the filesystem
+DUMP_NAME_PATTERN = re.compile(
+    r"^(?P<source>.+)_(?P<date>\d{4}-\d{2}-\d{2})_(?P<time>\d{2}[:_]\d{2}[:_]\d{2})$"
+)
+
+
+class SummaryStore:
+    """
+    Indexed history of summaries, scenes and reels, stored in SQLite.
+
+    Every /latest run adds a row per article that is new or whose summary
+    changed, so a source's history can be paged newest first. Reels are
+    stored per article, with their scene plan, and replaced when the article
+    is re-rendered. Sources and articles are stored and looked up by their
+    canonical URL.
+    """
+
+    def __init__(self, path: str | Path = STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        # WAL lets the read endpoints run while a job is writing
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Article URLs used to be stored as given, canonicalize the existing rows once
+            self._db.create_function("canonical_url", 1, canonical_url, deterministic=True)
+            with self._db:
+                self._db.execute("UPDATE summaries SET article_url = canonical_url(article_url)")
+                self._db.execute("UPDATE OR REPLACE reels SET article_url = canonical_url(article_url)")
+                self._db.execute("PRAGMA user_version = 1")
+
+    def _latest_summary(self, source: str, article_url: str) -> str | None:
+        row = self._db.execute(
+            """
+            SELECT summary FROM summaries WHERE source = ? AND article_url = ?
+            ORDER BY created_at DESC, id DESC LIMIT 1
+            """,
+            (source, article_url),
+        ).fetchone()
+        return row["summary"] if row else None
+
+    def add_summaries(self, source: str, summaries: dict[str, str], created_at: float | None = None):
+        """Store the summaries of a source, skipping the ones unchanged since they were last stored"""
+        created_at = created_at or time.time()
+        source = canonical_url(source)
+        rows = []
+        for article_url, summary in summaries.items():
+            article_url = canonical_url(article_url)
+            if self._latest_summary(source, article_url) != summary:
+                rows.append((source, article_url, summary, created_at))
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO summaries (source, article_url, summary, created_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def has_summary(self, article_url: str, created_at: float) -> bool:
+        row = self._db.execute(
+            "SELECT 1 FROM summaries WHERE article_url = ? AND created_at = ?",
+            (canonical_url(article_url), created_at),
+        ).fetchone()
+        return row is not None
+
+    def record_reel(self, article_url: str, reel_id: str, result: dict, scenes: list):
+        """Store a finished reel and the scene plan it was rendered from"""
+        scene_plan = [
+            scene.model_dump() if hasattr(scene, "model_dump") else scene for scene in scenes
+        ]
+        with self._db:
+            self._db.execute(
+                """
+                INSERT OR REPLACE INTO reels
+                    (article_url, reel_id, final_video_path, reel_url, hls_url, scenes, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    canonical_url(article_url),
+                    reel_id,
+                    result["final_video_path"],
+                    result["reel_url"],
+                    result["hls_url"],
+                    json.dumps(scene_plan),
+                    time.time(),
+                ),
+            )
+
+    def _reel(self, row: sqlite3.Row) -> dict | None:
+        if row["reel_id"] is None:
+            return None
+        return {
+            "reel_id": row["reel_id"],
+            "reel_url": row["reel_url"],
+            "hls_url": row["hls_url"],
+            "rendered_at": datetime.fromtimestamp(row["rendered_at"]).isoformat(),
+        }
+
+    def source_history(
+        self, source: str, limit: int = 20, cursor: str | None = None
+    ) -> tuple[list[dict], str | None]:
+        """
+        One page of a source's summaries, newest first.
+
+        Args:
+            source: Source URL, normalized the same way as when stored
+            limit: Page size
+            cursor: next_cursor returned with the previous page
+
+        Returns:
+            The page, and the cursor for the next one (None on the last page)
+        """
+        query = """
+            SELECT s.id, s.article_url, s.summary, s.created_at,
+                   r.reel_id, r.reel_url, r.hls_url, r.created_at AS rendered_at
+            FROM summaries s LEFT JOIN reels r ON r.article_url = s.article_url
+            WHERE s.source = ?
+        """
+        params: list = [canonical_url(source)]
+        if cursor:
+            created_at, row_id = cursor.split("_", 1)
+            query += " AND (s.created_at, s.id) < (?, ?)"
+            params += [float(created_at), int(row_id)]
+        query += " ORDER BY s.created_at DESC, s.id DESC LIMIT ?"
+        params.append(limit)
+
+        rows = self._db.execute(query, params).fetchall()
+        items = [
+            {
+                "article_url": row["article_url"],
+                "summary": row["summary"],
+                "created_at": datetime.fromtimestamp(row["created_at"]).isoformat(),
+                "reel": self._reel(row),
+            }
+            for row in rows
+        ]
+        next_cursor = f"{rows[-1]['created_at']}_{rows[-1]['id']}" if len(rows) == limit else None
+        return items, next_cursor
+
+    def article(self, article_url: str) -> dict | None:
+        """Latest summary of an article, with its reel and scene plan if one was rendered"""
+        row = self._db.execute(
+            """
+            SELECT s.source, s.summary, s.created_at,
+                   r.reel_id, r.reel_url, r.hls_url, r.scenes, r.created_at AS rendered_at
+            FROM summaries s LEFT JOIN reels r ON r.article_url = s.article_url
+            WHERE s.article_url = ?
+            ORDER BY s.created_at DESC LIMIT 1
+            """,
+            (canonical_url(article_url),),
+        ).fetchone()
+        if row is None:
+            return None
+
+        return {
+            "article_url": canonical_url(article_url),
+            "source": row["source"],
+            "summary": row["summary"],
+            "created_at": datetime.fromtimestamp(row["created_at"]).isoformat(),
+            "reel": self._reel(row),
+            "scenes": json.loads(row["scenes"]) if row["scenes"] else None,
+        }
+
+    def stats(self) -> dict:
+        summaries, sources = self._db.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT source) FROM summaries"
+        ).fetchone()
+        reels = self._db.execute("SELECT COUNT(*) FROM reels").fetchone()[0]
+        return {"summaries": summaries, "sources": sources, "reels": reels}
+
+
+def _dump_source(name: str, article_urls: list[str]) -> str:
+    """Best-effort source URL from a dump's file name, which lost its "/" and ":" characters"""
+    scheme, _, rest = name.partition("_--") if "_--" in name else name.partition(":--")
+    parts = rest.split("-")
+    # "-" is both the path separator and part of some host names, prefer a host the articles share
+    hosts = {urlparse(url).netloc for url in article_urls}
+    split = next((k for k in range(len(parts), 1, -1) if "-".join(parts[:k]) in hosts), 1)
+    return f"{scheme}://{'-'.join(parts[:split])}/{'/'.join(parts[split:])}"
+
+
+def import_json_dumps(store: SummaryStore, directory: str | Path = SUMMARIES_DIR) -> int:
+    """
+    One-off import of the {source}_{timestamp}.json files written before the store existed.
+
+    Returns:
+        Number of summaries imported
+    """
+    imported = 0
+    for path in sorted(Path(directory).glob("*.json")):
+        match = DUMP_NAME_PATTERN.match(path.stem)
+        if not match:
+            print(f"✗ Skipping {path.name}, not a summary dump")
+            continue
+
+        summaries = json.loads(path.read_text(encoding="utf-8")) or {}
+        # Some dumps also carry a "status" key next to the article URLs
+        summaries = {
+            url: summary
+            for url, summary in summaries.items()
+            if urlparse(url).scheme in ("http", "https") and isinstance(summary, str)
+        }
+        timestamp = f"{match['date']} {match['time'].replace('_', ':')}"
+        created_at = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").timestamp()
+        source = _dump_source(match["source"], list(summaries))
+        if summaries and store.has_summary(next(iter(summaries)), created_at):
+            print(f"Skipping {path.name}, already imported")
+            continue
+        store.add_summaries(source, summaries, created_at=created_at)
+        imported += len(summaries)
+        print(f"✓ Imported {len(summaries)} summaries for {source} from {path.name}")
+
+    return imported
+
+
+summary_store = SummaryStore()
+
+
+if __name__ == "__main__":
+    # python -m utils.summary_store [summaries directory]
+    directory = sys.argv[1] if len(sys.argv) > 1 else SUMMARIES_DIR
+    print(f"Imported {import_json_dumps(summary_store, directory)} summaries")
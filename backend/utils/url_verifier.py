@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from urllib.parse import urlparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from utils.http import get_http_client
+
+
+URL_VERIFY_TIMEOUT = 5
+URL_VERIFY_PER_HOST = int(os.getenv("URL_VERIFY_PER_HOST", 4))  # Concurrent checks per host
+URL_VERIFY_CACHE_TTL = int(os.getenv("URL_VERIFY_CACHE_TTL", 600))
+URL_VERIFY_CACHE_SIZE = 10_000
+
+
+async def check_url(client: httpx.AsyncClient, url: str) -> bool:
+    """
+    Whether a URL resolves to a page, following redirects to the end of the chain.
+
+    Tries HEAD first and falls back to GET, without reading the body, when
+    HEAD fails.
+    """
+    try:
+        response = await client.head(url, follow_redirects=True, timeout=URL_VERIFY_TIMEOUT)
+        # Servers that don't implement HEAD, or refuse it, often still serve GET
+        if response.status_code >= 400:
+            async with client.stream(
+                "GET", url, follow_redirects=True, timeout=URL_VERIFY_TIMEOUT
+            ) as response:
+                pass
+    except (httpx.HTTPError, httpx.InvalidURL):
+        # Includes timeouts, connection errors and redirect loops
+        return False
+
+    return 200 <= response.status_code < 400
+
+
+class UrlVerifier:
+    """
+    Concurrent URL existence checks on the shared connection pool.
+
+    Checks are capped per host so a list of links to one site doesn't hammer
+    it, results are cached for a while, and concurrent checks of the same
+    URL share one request.
+
+    Args:
+        per_host_limit: Maximum checks in flight per host
+        cache_ttl: Seconds a result is reused for
+        max_cache_entries: Number of results kept, oldest dropped first
+    """
+
+    def __init__(self, per_host_limit: int, cache_ttl: float, max_cache_entries: int):
+        self.per_host_limit = per_host_limit
+        self.cache_ttl = cache_ttl
+        self.max_cache_entries = max_cache_entries
+        self._results: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def cached(self, url: str) -> bool | None:
+        entry = self._results.get(url)
+        if entry is None:
+            return None
+        expires_at, exists = entry
+        if expires_at < time.monotonic():
+            del self._results[url]
+            return None
+        return exists
+
+    def remember(self, url: str, exists: bool):
+        self._results[url] = (time.monotonic() + self.cache_ttl, exists)
+        self._results.move_to_end(url)
+        while len(self._results) > self.max_cache_entries:
+            self._results.popitem(last=False)
+
+    async def _check(self, url: str) -> bool:
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        async with semaphore:
+            exists = await check_url(get_http_client(), url)
+        self.remember(url, exists)
+        return exists
+
+    async def verify(self, url: str) -> bool:
+        exists = self.cached(url)
+        if exists is not None:
+            return exists
+
+        task = self._in_flight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._check(url))
+            self._in_flight[url] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+        # Shielded so one caller giving up doesn't cancel the check for the others
+        return await asyncio.shield(task)
+
+    async def filter(self, urls: list[str]) -> list[str]:
+        """The URLs that exist, checked concurrently, in their original order"""
+        results = await asyncio.gather(*[self.verify(url) for url in urls])
+        return [url for url, exists in zip(urls, results) if exists]
+
+
+url_verifier = UrlVerifier(URL_VERIFY_PER_HOST, URL_VERIFY_CACHE_TTL, URL_VERIFY_CACHE_SIZE)
@@ -1,8 +1,134 @@
+from collections import OrderedDict
+from fractions import Fraction
+import asyncio
 import ffmpeg
-import tempfile
 import os
 from typing import List
 
+from utils.ffmpeg_runner import probe, run_ffmpeg
+from utils.workspace import workspace
+
+
+# Target profile for every scene clip, so reels can always be concatenated by stream copy
+REEL_WIDTH = 720
+REEL_HEIGHT = 1280
+REEL_FPS = 30
+REEL_VIDEO_CODEC = "h264"
+REEL_PIX_FMT = "yuv420p"
+REEL_AUDIO_CODEC = "aac"
+REEL_AUDIO_SAMPLE_RATE = 44100
+REEL_AUDIO_CHANNELS = 2
+REEL_VIDEO_FILTER = f"scale={REEL_WIDTH}:{REEL_HEIGHT},setsar=1,fps={REEL_FPS}"
+# Every clip that ends up in a reel is encoded with exactly these settings, so their
+# H.264 parameters and time bases match and the concat demuxer can stream copy them
+REEL_ENCODE_ARGS = {
+    "vcodec": "libx264",
+    "preset": "fast",
+    "pix_fmt": REEL_PIX_FMT,
+    "acodec": "aac",
+    "ar": REEL_AUDIO_SAMPLE_RATE,
+    "ac": REEL_AUDIO_CHANNELS,
+}
+# ffprobe stream fields compared by concat_signature()
+CONCAT_VIDEO_FIELDS = (
+    "codec_name", "profile", "level", "width", "height", "pix_fmt",
+    "avg_frame_rate", "time_base", "extradata_size",
+)
+CONCAT_AUDIO_FIELDS = ("codec_name", "profile", "sample_rate", "channels", "time_base")
+
+PROBE_CACHE_SIZE = 256  # Probe results kept, least recently used are dropped first
+
+# Probe results keyed on (path, size, mtime), so unchanged files are probed once
+_probe_cache: OrderedDict[tuple[str, int, int], dict] = OrderedDict()
+
+
+async def probe_media(path: str) -> dict:
+    """
+    Probe a media file, reusing the result while the file is unchanged.
+
+    Args:
+        path: Path to the media file
+
+    Returns:
+        Parsed ffprobe output with "format" and "streams"
+    """
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key in _probe_cache:
+        _probe_cache.move_to_end(key)
+        return _probe_cache[key]
+
+    result = await probe(path)
+    _probe_cache[key] = result
+    while len(_probe_cache) > PROBE_CACHE_SIZE:
+        _probe_cache.popitem(last=False)
+    return result
+
+
+def matches_reel_profile(info: dict) -> bool:
+    """Whether probed media already matches the reel codec, resolution, fps and audio format"""
+    video = next((s for s in info["streams"] if s["codec_type"] == "video"), None)
+    audio = next((s for s in info["streams"] if s["codec_type"] == "audio"), None)
+    if video is None or audio is None:
+        return False
+
+    frame_rate = video.get("avg_frame_rate", "0/0")
+    return (
+        video.get("codec_name") == REEL_VIDEO_CODEC
+        and video.get("width") == REEL_WIDTH
+        and video.get("height") == REEL_HEIGHT
+        and video.get("pix_fmt") == REEL_PIX_FMT
+        and frame_rate != "0/0"
+        and Fraction(frame_rate) == REEL_FPS
+        and audio.get("codec_name") == REEL_AUDIO_CODEC
+        and int(audio.get("sample_rate", 0)) == REEL_AUDIO_SAMPLE_RATE
+        and audio.get("channels") == REEL_AUDIO_CHANNELS
+    )
+
+
+def concat_signature(info: dict) -> tuple:
+    """
+    Stream parameters that must be identical across clips for the concat demuxer to copy them.
+
+    Beyond the reel profile this includes the time bases and the H.264
+    profile and level, which differ between encoders (e.g. Sora's and libx264).
+    """
+    video = next((s for s in info["streams"] if s["codec_type"] == "video"), {})
+    audio = next((s for s in info["streams"] if s["codec_type"] == "audio"), {})
+    return (
+        tuple(video.get(field) for field in CONCAT_VIDEO_FIELDS),
+        tuple(audio.get(field) for field in CONCAT_AUDIO_FIELDS),
+    )
+
+
+async def normalize_clip(video_path: str, force: bool = False) -> str:
+    """
+    Transcode a clip to the reel profile unless it already matches.
+
+    Args:
+        video_path: Path to the clip
+        force: Transcode even if the clip matches, to get the reel encoder's parameters
+
+    Returns:
+        Path to a clip in the reel profile (the input path if no transcode was needed)
+    """
+    if not force and matches_reel_profile(await probe_media(video_path)):
+        return video_path
+
+    print(f"Normalizing {video_path} to the reel profile...")
+    output_path = workspace.temp_path(".mp4")
+
+    source = ffmpeg.input(video_path)
+    video = (
+        source.video.filter("scale", REEL_WIDTH, REEL_HEIGHT)
+        .filter("setsar", 1)
+        .filter("fps", fps=REEL_FPS)
+    )
+    audio = source.audio.filter("aresample", REEL_AUDIO_SAMPLE_RATE)
+    stream = ffmpeg.output(video, audio, output_path, **REEL_ENCODE_ARGS)
+    await run_ffmpeg(stream)
+    return output_path
+
 
 async def combine_video_audio(video_path: str, audio_bytes: bytes) -> str:
     """
@@ -18,15 +144,12 @@ async def combine_video_audio(video_path: str, audio_bytes: bytes) -> str:
     print(f"Combining video and audio...")
 
     # Save audio bytes to temporary file
-    audio_temp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3", mode="wb")
-    audio_temp.write(audio_bytes)
-    audio_temp.close()
-    audio_path = audio_temp.name
+    audio_path = workspace.temp_path(".mp3")
+    with open(audio_path, "wb") as f:
+        f.write(audio_bytes)
 
     # Create output temporary file
-    output_temp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
-    output_temp.close()
-    output_path = output_temp.name
+    output_path = workspace.temp_path(".mp4")
 
     try:
         # Load video and audio streams
@@ -45,7 +168,7 @@ async def combine_video_audio(video_path: str, audio_bytes: bytes) -> str:
         )
 
         # Run FFmpeg command
-        ffmpeg.run(stream, overwrite_output=True, quiet=True)
+        await run_ffmpeg(stream)
 
         print(f"✓ Video and audio combined: {output_path}")
         return output_path
@@ -56,38 +179,43 @@ async def combine_video_audio(video_path: str, audio_bytes: bytes) -> str:
             os.remove(audio_path)
 
 
-async def combine_video_audio_with_padding(video_path: str, audio_bytes: bytes) -> str:
+async def combine_video_audio_with_padding(
+    video_path: str, audio: bytes | str, audio_duration: float | None = None
+) -> str:
     """
     Combine video with audio, adjusting lengths to match.
     If audio is longer, loop the video. If video is longer, loop the audio.
 
     Args:
         video_path: Path to the video file (.mp4)
-        audio_bytes: Audio data as bytes
+        audio: Audio data as bytes, or path to an audio file (left in place)
+        audio_duration: Audio length in seconds if already known, skips probing it
 
     Returns:
         Path to the combined video file
     """
     print(f"Combining video and audio with length adjustment...")
 
-    # Save audio bytes to temporary file
-    audio_temp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3", mode="wb")
-    audio_temp.write(audio_bytes)
-    audio_temp.close()
-    audio_path = audio_temp.name
+    if isinstance(audio, str):
+        audio_path = audio
+        owns_audio_file = False
+    else:
+        # Save audio bytes to temporary file
+        audio_path = workspace.temp_path(".mp3")
+        with open(audio_path, "wb") as f:
+            f.write(audio)
+        owns_audio_file = True
 
     # Create output temporary file
-    output_temp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
-    output_temp.close()
-    output_path = output_temp.name
+    output_path = workspace.temp_path(".mp4")
 
     try:
         # Probe to get video and audio durations
-        video_info = ffmpeg.probe(video_path)
-        audio_info = ffmpeg.probe(audio_path)
-
+        video_info = await probe_media(video_path)
         video_duration = float(video_info["format"]["duration"])
-        audio_duration = float(audio_info["format"]["duration"])
+        if audio_duration is None:
+            audio_info = await probe(audio_path)
+            audio_duration = float(audio_info["format"]["duration"])
 
         print(f"Video duration: {video_duration}s, Audio duration: {audio_duration}s")
 
@@ -105,26 +233,28 @@ async def combine_video_audio_with_padding(video_path: str, audio_bytes: bytes)
                 video.video,
                 audio.audio,
                 output_path,
-                vcodec="libx264",
-                acodec="aac",
                 t=audio_duration,  # Trim to audio duration
-                preset="fast",  # Faster encoding
+                # Encode straight to the reel profile so concatenation can stream copy
+                vf=REEL_VIDEO_FILTER,
+                **REEL_ENCODE_ARGS,
             )
         else:
             # Video is longer or equal - just combine normally
             video = ffmpeg.input(video_path)
             audio = ffmpeg.input(audio_path)
 
+            # Re-encoded like the looped branch: a stream copy would keep Sora's encoder
+            # parameters, and mixing those with libx264's breaks the concat stream copy
             stream = ffmpeg.output(
                 video.video,
                 audio.audio,
                 output_path,
-                vcodec="copy",  # Copy video codec (faster)
-                acodec="aac",
                 shortest=None,
+                vf=REEL_VIDEO_FILTER,
+                **REEL_ENCODE_ARGS,
             )
 
-        ffmpeg.run(stream, overwrite_output=True, quiet=True)
+        await run_ffmpeg(stream)
 
         print(f"✓ Video and audio combined with padding: {output_path}")
         return output_path
@@ -133,7 +263,7 @@ async def combine_video_audio_with_padding(video_path: str, audio_bytes: bytes)
         raise e
     finally:
         # Clean up temporary audio file
-        if os.path.exists(audio_path):
+        if owns_audio_file and os.path.exists(audio_path):
             os.remove(audio_path)
 
 
@@ -159,28 +289,35 @@ async def concatenate_videos(
 
     print(f"Concatenating {len(video_paths)} videos...")
 
+    # Bring every clip to the same profile first, so the concat demuxer can always stream copy.
+    # Clips that match the profile but not each other (e.g. from another encoder) are all
+    # re-encoded, a stream copy of a mix can produce a broken reel without failing.
+    infos = await asyncio.gather(*[probe_media(path) for path in video_paths])
+    force = len({concat_signature(info) for info in infos}) > 1
+    normalized_paths = await asyncio.gather(
+        *[normalize_clip(path, force=force) for path in video_paths]
+    )
+
     # Create output path if not provided
     if output_path is None:
-        output_temp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
-        output_temp.close()
-        output_path = output_temp.name
+        output_path = workspace.temp_path(".mp4")
 
     # Create a temporary file list for FFmpeg concat demuxer
-    concat_file = tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".txt")
+    concat_path = workspace.temp_path(".txt")
 
     try:
         # Write file list in FFmpeg concat format
-        for video_path in video_paths:
-            # Escape special characters and write to concat file
-            escaped_path = video_path.replace("'", "'\\''")
-            concat_file.write(f"file '{escaped_path}'\n")
-        concat_file.close()
+        with open(concat_path, "w") as concat_file:
+            for video_path in normalized_paths:
+                # Escape special characters and write to concat file
+                escaped_path = video_path.replace("'", "'\\''")
+                concat_file.write(f"file '{escaped_path}'\n")
 
         # Use concat demuxer (fast, no re-encoding if codecs match)
-        stream = ffmpeg.input(concat_file.name, format="concat", safe=0)
+        stream = ffmpeg.input(concat_path, format="concat", safe=0)
         stream = ffmpeg.output(stream, output_path, c="copy")
 
-        ffmpeg.run(stream, overwrite_output=True, quiet=True)
+        await run_ffmpeg(stream)
 
         print(f"✓ Videos concatenated successfully: {output_path}")
         return output_path
@@ -197,7 +334,7 @@ async def concatenate_videos(
             stream = ffmpeg.concat(*inputs, v=1, a=1)
             stream = ffmpeg.output(stream, output_path)
 
-            ffmpeg.run(stream, overwrite_output=True, quiet=True)
+            await run_ffmpeg(stream)
 
             print(f"✓ Videos concatenated with filter: {output_path}")
             return output_path
@@ -207,6 +344,109 @@ async def concatenate_videos(
             raise
 
     finally:
-        # Clean up concat file list
-        if os.path.exists(concat_file.name):
-            os.remove(concat_file.name)
+        # Clean up concat file list and clips transcoded only for this concat
+        if os.path.exists(concat_path):
+            os.remove(concat_path)
+        for normalized_path, video_path in zip(normalized_paths, video_paths):
+            if normalized_path != video_path and os.path.exists(normalized_path):
+                os.remove(normalized_path)
+
+
+async def render_reel(
+    scenes: List[tuple[str, str]], output_path: str | None = None
+) -> str:
+    """
+    Mux and concatenate every scene in a single ffmpeg filter graph.
+
+    Each scene's video is looped and trimmed to the length of its voice-over,
+    so the reel is encoded once instead of once per scene plus a concat pass.
+
+    Args:
+        scenes: List of (video_path, audio_path) pairs in playback order
+        output_path: Optional output path. If None, creates a temporary file
+
+    Returns:
+        Path to the rendered reel
+    """
+    if not scenes:
+        raise ValueError("scenes list cannot be empty")
+
+    print(f"Rendering reel from {len(scenes)} scenes in a single pass...")
+
+    if output_path is None:
+        output_path = workspace.temp_path(".mp4")
+
+    audio_infos = await asyncio.gather(
+        *[probe_media(audio_path) for _, audio_path in scenes]
+    )
+
+    streams = []
+    for (video_path, audio_path), audio_info in zip(scenes, audio_infos):
+        duration = float(audio_info["format"]["duration"])
+
+        # Loop the clip indefinitely and cut it at the end of the voice-over
+        video = (
+            ffmpeg.input(video_path, stream_loop=-1)
+            .video.trim(duration=duration)
+            .setpts("PTS-STARTPTS")
+            .filter("scale", REEL_WIDTH, REEL_HEIGHT)
+            .filter("setsar", 1)
+            .filter("fps", fps=REEL_FPS)
+        )
+        audio = (
+            ffmpeg.input(audio_path)
+            .audio.filter("atrim", duration=duration)
+            .filter("asetpts", "PTS-STARTPTS")
+            .filter("aresample", REEL_AUDIO_SAMPLE_RATE)
+            .filter("aformat", channel_layouts="stereo")
+        )
+        streams.extend([video, audio])
+
+    joined = ffmpeg.concat(*streams, v=1, a=1).node
+    stream = ffmpeg.output(
+        joined[0],
+        joined[1],
+        output_path,
+        vcodec="libx264",
+        acodec="aac",
+        preset="fast",
+        movflags="+faststart",
+    )
+
+    await run_ffmpeg(stream)
+
+    print(f"✓ Reel rendered: {output_path}")
+    return output_path
+
+
+async def segment_hls(
+    video_path: str, output_dir: str, segment_seconds: int = 2
+) -> str:
+    """
+    Split a reel into an HLS playlist and MPEG-TS segments without re-encoding.
+
+    Args:
+        video_path: Path to the reel (.mp4)
+        output_dir: Directory to write index.m3u8 and the segments to
+        segment_seconds: Target segment length, actual cuts land on keyframes
+
+    Returns:
+        Path to the playlist
+    """
+    print(f"Segmenting {video_path} for HLS...")
+    os.makedirs(output_dir, exist_ok=True)
+    playlist_path = os.path.join(output_dir, "index.m3u8")
+
+    stream = ffmpeg.output(
+        ffmpeg.input(video_path),
+        playlist_path,
+        c="copy",
+        f="hls",
+        hls_time=segment_seconds,
+        hls_playlist_type="vod",
+        hls_segment_filename=os.path.join(output_dir, "segment_%03d.ts"),
+    )
+    await run_ffmpeg(stream)
+
+    print(f"✓ HLS playlist created: {playlist_path}")
+    return playlist_path
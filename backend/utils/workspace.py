@@ -0,0 +1,153 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+import os
+import shutil
+import tempfile
+
+
+# Point REELY_SCRATCH_DIR at a tmpfs mount (e.g. /dev/shm/reely) to keep hot intermediates in memory
+SCRATCH_DIR = Path(os.getenv("REELY_SCRATCH_DIR", Path(tempfile.gettempdir()) / "reely"))
+REELS_DIR = Path(os.getenv("REELY_REELS_DIR", Path(__file__).resolve().parent.parent / "reels"))
+SCRATCH_QUOTA_BYTES = int(os.getenv("REELY_SCRATCH_QUOTA_BYTES", 5 * 1024 * 1024 * 1024))
+
+SHARED_SCOPE = "_shared"  # Used for intermediates created outside of any scope
+
+_current_scope: ContextVar[Path | None] = ContextVar("current_scope", default=None)
+
+
+def _size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+class MediaWorkspace:
+    """
+    Scoped scratch directories for media intermediates, with a disk quota.
+
+    Each scope (e.g. one article) gets its own directory. Scopes are
+    reference counted while in use, and once the scratch area grows past
+    the quota the least recently used idle scopes are deleted. Final reels
+    are persisted outside the scratch area and never collected.
+
+    Args:
+        scratch_dir: Directory for intermediates, may be on tmpfs
+        reels_dir: Directory for persisted final reels
+        quota_bytes: Scratch usage above which idle scopes are collected
+    """
+
+    def __init__(self, scratch_dir: Path, reels_dir: Path, quota_bytes: int):
+        self.scratch_dir = Path(scratch_dir)
+        self.reels_dir = Path(reels_dir)
+        self.quota_bytes = quota_bytes
+        self.collected_bytes = 0
+        self._references: dict[str, int] = {}
+
+        self.scratch_dir.mkdir(parents=True, exist_ok=True)
+        self.reels_dir.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def scope(self, name: str):
+        """
+        Route every temp_path() call made in this context into the scope's directory.
+
+        The scope is protected from garbage collection until the block exits.
+        Tasks started inside the block inherit the scope.
+        """
+        directory = self.scratch_dir / name
+        directory.mkdir(parents=True, exist_ok=True)
+        self._references[name] = self._references.get(name, 0) + 1
+        token = _current_scope.set(directory)
+        try:
+            yield directory
+        finally:
+            _current_scope.reset(token)
+            self._references[name] -= 1
+            if not self._references[name]:
+                del self._references[name]
+            os.utime(directory)
+            self.collect()
+
+    def temp_path(self, suffix: str = "") -> str:
+        """Create an empty file for an intermediate in the current scope and return its path"""
+        directory = _current_scope.get() or self.scratch_dir / SHARED_SCOPE
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=directory, suffix=suffix)
+        os.close(fd)
+        return path
+
+    def scope_dir(self, name: str) -> Path:
+        return self.scratch_dir / name
+
+    def keep(self, path: str, name: str) -> str:
+        """
+        Give an intermediate a stable name in the current scope.
+
+        The file is still collected with its scope, unlike persist().
+        """
+        directory = _current_scope.get() or self.scratch_dir / SHARED_SCOPE
+        return self._link(path, directory / name)
+
+    def persist(self, path: str, name: str) -> str:
+        """
+        Keep a final output outside the scratch area.
+
+        Hard links when possible, otherwise copies (e.g. when scratch is on tmpfs),
+        so the scratch file can still be collected with its scope.
+        """
+        return self._link(path, self.reels_dir / name)
+
+    def _link(self, path: str, destination: Path) -> str:
+        temp_destination = destination.with_suffix(destination.suffix + ".part")
+        temp_destination.unlink(missing_ok=True)
+        try:
+            os.link(path, temp_destination)
+        except OSError:
+            shutil.copyfile(path, temp_destination)
+        os.replace(temp_destination, destination)
+        return str(destination)
+
+    def _collectable(self) -> list[tuple[float, Path]]:
+        """Idle scopes and shared intermediates, oldest first"""
+        entries = []
+        for path in self.scratch_dir.iterdir():
+            if path.name == SHARED_SCOPE:
+                entries.extend((p.stat().st_mtime, p) for p in path.iterdir() if p.is_file())
+            elif path.name not in self._references:
+                entries.append((path.stat().st_mtime, path))
+        return sorted(entries)
+
+    def usage(self) -> int:
+        return _size(self.scratch_dir)
+
+    def collect(self):
+        """Delete least recently used idle scopes until scratch usage is under the quota"""
+        usage = self.usage()
+        if usage <= self.quota_bytes:
+            return
+
+        for _, path in self._collectable():
+            if usage <= self.quota_bytes:
+                break
+            size = _size(path)
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+            usage -= size
+            self.collected_bytes += size
+
+        print(f"Workspace collected down to {usage} bytes")
+
+    def stats(self) -> dict:
+        return {
+            "scratch_dir": str(self.scratch_dir),
+            "usage_bytes": self.usage(),
+            "quota_bytes": self.quota_bytes,
+            "collected_bytes": self.collected_bytes,
+            "active_scopes": len(self._references),
+        }
+
+
+workspace = MediaWorkspace(SCRATCH_DIR, REELS_DIR, SCRATCH_QUOTA_BYTES)